@@ -1,5 +1,19 @@
-from .models import AIModels
-from .core import ClassroomAssistant
-from .engagement import EngagementDetector
+import importlib
 
-__all__ = ['AIModels', 'ClassroomAssistant', 'EngagementDetector']
\ No newline at end of file
+# Submodules are imported on first attribute access, so `import assistant` (or any one
+# submodule) does not drag in torch, OpenCV and the audio stack all at once.
+_EXPORTS = {
+    'AIModels': '.models',
+    'ClassroomAssistant': '.core',
+    'EngagementDetector': '.engagement'
+}
+
+__all__ = ['AIModels', 'ClassroomAssistant', 'EngagementDetector']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
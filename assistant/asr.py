@@ -0,0 +1,231 @@
+import abc
+import json
+import logging
+import os
+import time
+import wave
+from typing import Callable, Dict, List, Optional
+
+ASR_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'asr')
+
+
+class ASRStream(abc.ABC):
+    """One utterance. Feed 16-bit mono PCM with accept(), then call finish() at end of speech."""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.audio_bytes = 0
+        self.processing_seconds = 0.0
+        self.partials = 0
+        self.eos_latency = None
+        self.final_text = None
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        start = time.perf_counter()
+        self.audio_bytes += len(pcm)
+        partial = self._accept(pcm)
+        self.processing_seconds += time.perf_counter() - start
+        if partial:
+            self.partials += 1
+        return partial
+
+    def finish(self) -> str:
+        start = time.perf_counter()
+        self.final_text = (self._finish() or "").strip()
+        self.eos_latency = time.perf_counter() - start
+        self.processing_seconds += self.eos_latency
+        return self.final_text
+
+    @abc.abstractmethod
+    def _accept(self, pcm: bytes) -> Optional[str]:
+        """Consume a chunk of audio; return the current partial transcript, if any."""
+
+    @abc.abstractmethod
+    def _finish(self) -> str:
+        """Return the final transcript of everything accepted."""
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.audio_bytes / 2 / self.sample_rate
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'audio_seconds': self.audio_seconds,
+            'real_time_factor': self.processing_seconds / self.audio_seconds if self.audio_bytes else None,
+            'eos_to_text_ms': self.eos_latency * 1000 if self.eos_latency is not None else None,
+            'partials': self.partials
+        }
+
+
+class ASRBackend(abc.ABC):
+    name = "base"
+    streaming = False
+
+    @abc.abstractmethod
+    def start_stream(self, sample_rate: int) -> ASRStream:
+        """A new stream for one utterance of 16-bit mono PCM at sample_rate."""
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        stream = self.start_stream(sample_rate)
+        stream.accept(pcm)
+        return stream.finish()
+
+
+class _GoogleStream(ASRStream):
+    def __init__(self, backend: "GoogleASRBackend", sample_rate: int):
+        super().__init__(sample_rate)
+        self.backend = backend
+        self._chunks = []
+
+    def _accept(self, pcm: bytes) -> Optional[str]:
+        self._chunks.append(pcm)
+        return None
+
+    def _finish(self) -> str:
+        sr = self.backend.sr
+        pcm = b"".join(self._chunks)
+        offline = self.backend.offline()
+        if offline is not None:
+            return offline.transcribe(pcm, self.sample_rate)
+        try:
+            return self.backend.recognizer.recognize_google(sr.AudioData(pcm, self.sample_rate, 2))
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            offline = self.backend.go_offline(e)
+            return offline.transcribe(pcm, self.sample_rate) if offline is not None else ""
+
+
+class GoogleASRBackend(ASRBackend):
+    """The original online recognizer; it only produces a transcript at end of speech.
+
+    When the service cannot be reached and a vosk model is installed, utterances are
+    transcribed offline instead, for `retry_online_after` seconds before trying online again.
+    """
+    name = "google"
+
+    def __init__(self, fallback_model_path: Optional[str] = None, retry_online_after: float = 60.0):
+        import speech_recognition as sr
+
+        self.logger = logging.getLogger(__name__)
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.fallback_model_path = fallback_model_path
+        self.retry_online_after = retry_online_after
+        self._fallback = None
+        self._fallback_error = None
+        self._offline_until = 0.0
+
+    def start_stream(self, sample_rate: int) -> ASRStream:
+        return _GoogleStream(self, sample_rate)
+
+    def offline(self) -> Optional[ASRBackend]:
+        """The offline recognizer while the online one is considered down, else None."""
+        return self._fallback if time.monotonic() < self._offline_until else None
+
+    def go_offline(self, error: Exception) -> Optional[ASRBackend]:
+        if self._fallback is None and self._fallback_error is None:
+            try:
+                self._fallback = VoskASRBackend(self.fallback_model_path)
+            except RuntimeError as e:
+                self._fallback_error = e
+                self.logger.warning(f"Online speech recognition unavailable ({error}) and there is no offline "
+                                    f"fallback ({e}). For speech input without a network, install vosk and its "
+                                    f"model and set \"asr_backend\": \"vosk\" in config/ai_config.json")
+                return None
+        if self._fallback is None:
+            self.logger.error(f"Online speech recognition unavailable: {error}")
+            return None
+        self.logger.warning(f"Online speech recognition unavailable ({error}); using the offline vosk model "
+                            f"for the next {self.retry_online_after:.0f}s")
+        self._offline_until = time.monotonic() + self.retry_online_after
+        return self._fallback
+
+
+class _VoskStream(ASRStream):
+    def __init__(self, backend: "VoskASRBackend", sample_rate: int):
+        super().__init__(sample_rate)
+        self.recognizer = backend.vosk.KaldiRecognizer(backend.model, sample_rate)
+        self._segments = []
+
+    def _accept(self, pcm: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self._segments.append(text)
+            return " ".join(self._segments) or None
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._segments + [partial]).strip() or None
+
+    def _finish(self) -> str:
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        return " ".join(self._segments + [text])
+
+
+class VoskASRBackend(ASRBackend):
+    """Offline CPU recognizer (vosk/Kaldi) that streams partial hypotheses while the student speaks."""
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path: Optional[str] = None):
+        try:
+            import vosk
+        except ImportError as e:
+            raise RuntimeError("The vosk package is required for offline speech recognition") from e
+
+        self.model_path = model_path or os.path.join(ASR_MODEL_DIR, 'vosk-model-small-en-us-0.15')
+        if not os.path.isdir(self.model_path):
+            raise RuntimeError(f"Missing speech recognition model: {self.model_path}")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(self.model_path)
+
+    def start_stream(self, sample_rate: int) -> ASRStream:
+        return _VoskStream(self, sample_rate)
+
+
+ASR_BACKENDS = {
+    GoogleASRBackend.name: GoogleASRBackend,
+    VoskASRBackend.name: VoskASRBackend
+}
+
+
+def create_asr_backend(backend: str = "google", **options) -> ASRBackend:
+    try:
+        backend_cls = ASR_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown speech recognition backend '{backend}'. Choose from: {', '.join(ASR_BACKENDS)}")
+    return backend_cls(**options)
+
+
+def transcribe_wav(backend: ASRBackend, path: str, frame_ms: int = 30, realtime: bool = False,
+                   on_partial: Optional[Callable[[str], None]] = None) -> Dict[str, object]:
+    """Stream a 16-bit mono WAV file through a backend as if it came from the microphone."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        sample_rate = wav.getframerate()
+        pcm = wav.readframes(wav.getnframes())
+
+    frame_bytes = sample_rate * frame_ms // 1000 * 2
+    stream = backend.start_stream(sample_rate)
+    partials: List[str] = []
+    first_partial = None
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), frame_bytes):
+        partial = stream.accept(pcm[offset:offset + frame_bytes])
+        if partial:
+            if first_partial is None:
+                first_partial = time.perf_counter() - start
+            if not partials or partials[-1] != partial:
+                partials.append(partial)
+                if on_partial:
+                    on_partial(partial)
+        if realtime:
+            time.sleep(frame_ms / 1000)
+    text = stream.finish()
+
+    result = stream.stats()
+    result.update(text=text, partial_hypotheses=len(partials),
+                  first_partial_ms=first_partial * 1000 if first_partial is not None else None)
+    return result
@@ -0,0 +1,161 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+class MicrophoneStream:
+    """A microphone that stays open between voice queries.
+
+    A reader thread classifies every frame as speech or silence against a noise floor that
+    is continuously re-estimated from silent frames, so no per-query calibration is needed.
+    listen() returns as soon as the speaker has been quiet for `end_silence_ms`.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, pre_roll_ms: int = 300,
+                 end_silence_ms: int = 600, min_speech_ms: int = 120, speech_ratio: float = 3.0,
+                 min_energy: float = 150.0, noise_adapt: float = 0.05, device_index: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.speech_ratio = speech_ratio
+        self.min_energy = min_energy
+        self.noise_adapt = noise_adapt
+        self.device_index = device_index
+        self.noise_floor = None
+        self._pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._frames = queue.Queue(maxsize=int(60 * 1000 / frame_ms))
+        self._listening = threading.Event()
+        self._running = threading.Event()
+        self._source = None
+        self._thread = None
+        self.last_endpoint = {}
+
+    def start(self):
+        import speech_recognition as sr
+
+        if self._running.is_set():
+            return
+        self._source = sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                                     chunk_size=self.frame_samples)
+        self._source.__enter__()
+        self._running.set()
+        self._thread = threading.Thread(target=self._read_loop, name="microphone-stream", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Microphone stream open at {self.sample_rate} Hz, {self.frame_ms} ms frames")
+
+    def _is_speech(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        energy = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        speech = energy > max(self.noise_floor * self.speech_ratio, self.min_energy)
+        if not speech:
+            self.noise_floor += self.noise_adapt * (energy - self.noise_floor)
+        return speech
+
+    def _read_loop(self):
+        while self._running.is_set():
+            try:
+                frame = self._source.stream.read(self.frame_samples)
+            except Exception as e:
+                self.logger.error(f"Microphone read failed: {e}")
+                time.sleep(0.1)
+                continue
+            speech = self._is_speech(frame)
+            if self._listening.is_set():
+                try:
+                    self._frames.put_nowait((frame, speech))
+                except queue.Full:
+                    pass
+            else:
+                self._pre_roll.append((frame, speech))
+
+    def listen(self, timeout: float = 5.0, max_seconds: float = 8.0,
+               stop_event: Optional[threading.Event] = None,
+               on_frame: Optional[Callable[[bytes], None]] = None):
+        """Return the next utterance as speech_recognition AudioData, or None on timeout or stop.
+
+        on_frame receives every frame of the utterance as it is captured, so a streaming
+        recognizer can decode while the student is still speaking.
+        """
+        import speech_recognition as sr
+
+        self._frames = queue.Queue(maxsize=self._frames.maxsize)
+        pending = list(self._pre_roll)
+        self._pre_roll.clear()
+        self._listening.set()
+
+        collected = []
+        speech_run = 0
+        silence_run = 0
+        started = False
+        start_time = time.monotonic()
+        speech_start = None
+        try:
+            while not (stop_event and stop_event.is_set()):
+                if pending:
+                    frame, speech = pending.pop(0)
+                else:
+                    try:
+                        frame, speech = self._frames.get(timeout=0.1)
+                    except queue.Empty:
+                        if not started and time.monotonic() - start_time > timeout:
+                            return None
+                        continue
+
+                collected.append(frame)
+                if started and on_frame:
+                    on_frame(frame)
+                if not started:
+                    speech_run = speech_run + 1 if speech else 0
+                    if speech_run >= self.min_speech_frames:
+                        started = True
+                        speech_start = time.monotonic()
+                        # Keep the pre-roll so the first syllable is not clipped
+                        collected = collected[-(speech_run + self._pre_roll.maxlen):]
+                        if on_frame:
+                            for captured in collected:
+                                on_frame(captured)
+                    elif time.monotonic() - start_time > timeout:
+                        return None
+                    else:
+                        collected = collected[-self._pre_roll.maxlen:]
+                    continue
+
+                silence_run = 0 if speech else silence_run + 1
+                if silence_run >= self.end_silence_frames or time.monotonic() - speech_start > max_seconds:
+                    break
+            else:
+                return None
+        finally:
+            self._listening.clear()
+
+        self.last_endpoint = {
+            'speech_seconds': len(collected) * self.frame_ms / 1000,
+            'trailing_silence_ms': silence_run * self.frame_ms,
+            'noise_floor': self.noise_floor,
+            'endpoint_time': time.monotonic()
+        }
+        return sr.AudioData(b"".join(collected), self.sample_rate, 2)
+
+    def stats(self) -> Dict[str, object]:
+        return {'running': self._running.is_set(), 'noise_floor': self.noise_floor, **self.last_endpoint}
+
+    def close(self):
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=1)
+        if self._source is not None:
+            try:
+                self._source.__exit__(None, None, None)
+            except Exception as e:
+                self.logger.debug(f"Microphone close failed: {e}")
+            self._source = None
@@ -0,0 +1,155 @@
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+VideoSource = Union[int, str]
+
+
+def parse_source(value: Any) -> VideoSource:
+    """Device indexes stay ints; anything else is a file path or stream URL (rtsp://, http://)."""
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    return int(text) if text.isdigit() else text
+
+
+class CameraCapture:
+    """A video source opened at the analysis resolution, decoding only the frames that are used.
+
+    For cameras the driver is asked for `size`, a compressed pixel format (MJPG, so USB
+    bandwidth is not the limit) and a one-frame buffer, so the newest frame is never behind a
+    queue. What the driver actually agreed to is in `format`; if it picked another size,
+    frames are resized into a reused buffer.
+
+    `grab()` only dequeues a frame; `retrieve()` decodes the last grabbed one. `read()` does
+    both, first discarding stale frames when the driver reports a buffer of several frames.
+    """
+
+    def __init__(self, source: Any = 0, size: Tuple[int, int] = (320, 240), fourcc: Optional[str] = "MJPG",
+                 fps: Optional[float] = None, buffer_size: int = 1, max_drain: int = 4):
+        self.logger = logging.getLogger(__name__)
+        self.source: VideoSource = parse_source(source)
+        self.size = size
+        self.fourcc = fourcc
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.max_drain = max_drain
+        self.is_camera = isinstance(self.source, int)
+        self.format: Dict[str, Any] = {}
+        self._cap = None
+        self._raw = None
+        self._resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self.grabbed = 0
+        self.decoded = 0
+        self.dropped = 0
+        self.grab_time = 0.0
+        self.decode_time = 0.0
+
+    def open(self) -> bool:
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            return False
+        if self.is_camera:
+            # V4L2 applies the pixel format before the size, so the order matters
+            if self.fourcc:
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.size[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.size[1])
+            if self.fps:
+                cap.set(cv2.CAP_PROP_FPS, self.fps)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        self._cap = cap
+        self.format = self._negotiated()
+        self.logger.info(f"Video source {self.source!r}: {self.format}")
+        return True
+
+    def _negotiated(self) -> Dict[str, Any]:
+        cap = self._cap
+        code = int(cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\0 ") if code > 0 else None
+        width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return {
+            'backend': cap.getBackendName(),
+            'fourcc': fourcc,
+            'width': width,
+            'height': height,
+            'fps': cap.get(cv2.CAP_PROP_FPS) or None,
+            'buffer_size': int(cap.get(cv2.CAP_PROP_BUFFERSIZE)) or None,
+            'resized': (width, height) != tuple(self.size)
+        }
+
+    def rewind(self):
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def grab(self) -> bool:
+        start = time.perf_counter()
+        ok = self._cap.grab()
+        self.grab_time += time.perf_counter() - start
+        if ok:
+            self.grabbed += 1
+        return ok
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        """Decode the last grabbed frame at `size`. The returned array is reused by the next call."""
+        start = time.perf_counter()
+        ok, frame = self._cap.retrieve(self._raw)
+        if not ok:
+            return None
+        self._raw = frame
+        if frame.shape[1::-1] != tuple(self.size):
+            frame = cv2.resize(frame, self.size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        self.decode_time += time.perf_counter() - start
+        self.decoded += 1
+        return frame
+
+    def read(self) -> Optional[np.ndarray]:
+        """The newest frame, decoded; None if the source has none."""
+        start = time.perf_counter()
+        if not self.grab():
+            return None
+        # Only drain a buffer the backend says holds more than one frame (MSMF and DSHOW report
+        # 0 or -1), and only if this grab came back at once, i.e. from a queue
+        queued = time.perf_counter() - start <= 0.004
+        if queued and self.is_camera and (self.format.get('buffer_size') or 0) > 1:
+            for _ in range(self.max_drain):
+                start = time.perf_counter()
+                if not self.grab():
+                    break
+                if time.perf_counter() - start > 0.004:
+                    # Waited for the camera, so the queue was empty and nothing was stale
+                    break
+                # Came back at once: the frame grabbed before it was stale
+                self.dropped += 1
+        return self.retrieve()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'format': self.format,
+            'grabbed': self.grabbed,
+            'decoded': self.decoded,
+            'dropped': self.dropped,
+            'grab_ms_per_frame': self.grab_time / self.grabbed * 1000 if self.grabbed else 0.0,
+            'decode_ms_per_frame': self.decode_time / self.decoded * 1000 if self.decoded else 0.0
+        }
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+            self.logger.info(f"Video source {self.source!r} capture: {self.stats()}")
+
+
+def open_capture(source: Any, options: Optional[Dict[str, Any]] = None,
+                 size: Tuple[int, int] = (320, 240)) -> Optional[CameraCapture]:
+    """Open `source` with the engagement "capture" options; None if it cannot be opened."""
+    options = options or {}
+    capture = CameraCapture(
+        source,
+        size=(options.get("width", size[0]), options.get("height", size[1])),
+        fourcc=options.get("fourcc", "MJPG"),
+        fps=options.get("fps"),
+        buffer_size=options.get("buffer_size", 1))
+    return capture if capture.open() else None
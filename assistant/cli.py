@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+# Only the text path lives here: no tkinter, PIL or pyttsx3, and OpenCV only with --engagement
+
+
+def _track_engagement(assistant, stop_event: threading.Event):
+    from .capture import open_capture
+
+    logger = logging.getLogger(__name__)
+    engagement_config = assistant.config.get("engagement", {})
+    sources = engagement_config.get("video_sources") or [0]
+    cap = open_capture(sources[0], engagement_config.get("capture"))
+    if cap is None:
+        logger.warning("Could not open webcam; engagement tracking disabled")
+        return
+    try:
+        while not stop_event.is_set():
+            frame = cap.read()
+            if frame is not None:
+                assistant.engagement_detector.analyze_frame(frame)
+            stop_event.wait(assistant.governor.frame_interval())
+    finally:
+        cap.release()
+
+
+def _print_response(response: Dict, out=sys.stdout):
+    label = "Assistant" if response.get('success', False) else "System"
+    print(f"{label}: {response['text']}", file=out)
+    if response.get('tips'):
+        print("Learning Tips:\n- " + "\n- ".join(response['tips']), file=out)
+
+
+def _swap_model(assistant, model_name: str):
+    if not model_name:
+        print(f"System: model={assistant.models.model_name}")
+        return
+
+    def report_swap(report):
+        if report.get('success'):
+            memory = f"peak RSS {report['peak_rss_mb']} MB" if 'peak_rss_mb' in report else "RSS unavailable"
+            print(f"\nSystem: now using {model_name} (load {report['load_seconds']:.1f}s, "
+                  f"switch {report['switch_ms']:.2f} ms, {memory})")
+        else:
+            print(f"\nSystem: could not load {model_name}: {report.get('error')}")
+
+    print(f"System: loading {model_name} in the background; {assistant.models.model_name} keeps answering")
+    assistant.models.swap_model(model_name, on_done=report_swap)
+
+
+def _repl(assistant):
+    print("AI Teaching Assistant (headless). Type a question, /status, /clear, /model NAME or /quit.")
+    while True:
+        try:
+            query = input("You: ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return
+        if not query:
+            continue
+        if query in ("/quit", "/exit", "quit", "exit"):
+            return
+        if query == "/clear":
+            assistant.clear_conversation()
+            print("System: Conversation history cleared.")
+        elif query.startswith("/model"):
+            _swap_model(assistant, query[len("/model"):].strip())
+        elif query == "/status":
+            print(f"System: engagement={assistant.engagement_status} governor={assistant.governor.state()} "
+                  f"coalesced={assistant.inflight.stats()} "
+                  f"degenerate={getattr(assistant.models, 'degenerate_counts', {})}")
+        else:
+            _print_response(assistant.process_query(query))
+
+
+def run(args, process_start: Optional[float] = None) -> int:
+    """Headless entry point: a REPL, or a single question with --ask."""
+    logger = logging.getLogger(__name__)
+    process_start = process_start if process_start is not None else time.perf_counter()
+    timings = {}
+
+    start = time.perf_counter()
+    from .core import ClassroomAssistant
+    timings['import_core'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        assistant = ClassroomAssistant(engagement=args.engagement)
+    except Exception as e:
+        logger.critical(f"Assistant failed to start: {e}", exc_info=True)
+        print(f"CRITICAL ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    timings['assistant_init'] = time.perf_counter() - start
+    timings['ready'] = time.perf_counter() - process_start
+
+    stop_event = threading.Event()
+    if assistant.engagement_detector:
+        threading.Thread(target=_track_engagement, args=(assistant, stop_event), daemon=True).start()
+
+    try:
+        if args.ask:
+            start = time.perf_counter()
+            response = assistant.process_query(args.ask)
+            timings['first_answer'] = time.perf_counter() - start
+            timings['total'] = time.perf_counter() - process_start
+            _print_response(response)
+            report_startup(timings, echo=args.startup_time)
+            status = 0 if response.get('success', False) else 1
+        else:
+            report_startup(timings, echo=args.startup_time)
+            _repl(assistant)
+            status = 0
+    finally:
+        stop_event.set()
+        assistant.shutdown()
+    return status
+
+
+def report_startup(timings: Dict[str, float], echo: bool = False):
+    """Print startup timings with --startup-time, and append them to $CLASSROOM_STARTUP_REPORT if set.
+
+    The file is how tools.cold_start reads timings from windowed builds, which have no console.
+    """
+    if echo:
+        parts = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in timings.items())
+        print(f"Startup: {parts}", file=sys.stderr)
+    report_path = os.environ.get("CLASSROOM_STARTUP_REPORT")
+    if report_path:
+        try:
+            with open(report_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(timings) + "\n")
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Could not write startup report: {e}")
@@ -0,0 +1,17 @@
+import json
+import logging
+import os
+from typing import Any, Dict
+
+CONFIG_PATH = os.path.join("config", "ai_config.json")
+
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.getLogger(__name__).warning(f"Ignoring unreadable config {path}: {e}")
+        return {}
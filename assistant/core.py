@@ -1,43 +1,237 @@
 # core.py — Cleaned to remove personalization and profile dependencies
 
 import logging
+import os
 from datetime import datetime
 from typing import Dict, Any
 import threading
 import time
+from .cache import ResponseCache
+from .config import load_config
+from .faq import FAQIndex
+from .governor import ResourceGovernor
+from .interactions import InteractionStore
+from .prefetch import FollowUpPrefetcher, history_followups, template_followups
+from .scheduler import DeadlineExceeded, QueryRejected, QueryScheduler, RateLimited
+from .profile import load_profile, save_profile
+from .sessions import DEFAULT_SESSION, Session, SessionManager
+from .singleflight import SingleFlight
+from .text import normalize_query
+from .speculation import SpeculativeQueryRunner
 from .models import AIModels
-from .engagement import EngagementDetector
 
 class ClassroomAssistant:
-    def __init__(self):
+    def __init__(self, engagement: bool = True, models=None, data_dir: str = "data"):
+        """`models` replaces the AIModels instance (e.g. a stub for load tests); `data_dir`
+        holds the interaction store, sessions and student profile."""
         self.logger = logging.getLogger(__name__)
+        self.config = load_config()
+        self.data_dir = data_dir
+        self.governor = ResourceGovernor()
+        speech_config = self.config.get("speech", {})
         try:
-            self.models = AIModels()
+            self.models = models or AIModels(
+                asr_backend=speech_config.get("asr_backend", "google"),
+                asr_options=speech_config.get("asr_options"),
+                model_options=self.config.get("model"))
+            self.models.governor = self.governor
         except Exception as e:
             self.logger.critical(f"Failed to initialize AI models: {e}")
             raise RuntimeError("Failed to initialize AI models") from e
 
-        self.engagement_detector = EngagementDetector()
+        self.engagement_detector = self._create_engagement_detector() if engagement else None
+        self.profile_path = os.path.join(data_dir, "student_profile.json")
+        self.interactions = InteractionStore(
+            os.path.join(data_dir, "interactions.db"),
+            max_rows=self.config.get("interactions", {}).get("max_rows"))
+        session_config = self.config.get("sessions", {})
+        self.sessions = SessionManager(
+            session_dir=os.path.join(data_dir, "sessions"),
+            max_sessions=session_config.get("max_sessions", 32),
+            max_memory_bytes=int(session_config.get("max_memory_mb", 8) * 1024 * 1024),
+            max_history=session_config.get("max_history", 20),
+            default_profile=load_profile(self.profile_path, store=self.interactions))
         self._voice_lock = threading.Lock()
-        self._processing_lock = threading.Lock()
+        scheduler_config = self.config.get("scheduler", {})
+        self.scheduler = QueryScheduler(
+            rate_per_minute=scheduler_config.get("rate_per_minute", 20),
+            burst=scheduler_config.get("burst", 5),
+            deadlines=scheduler_config.get("deadlines"))
+        self.teacher_sessions = set(scheduler_config.get("teacher_sessions", []))
+        self.inflight = SingleFlight()
+        cache_config = self.config.get("response_cache", {})
+        self.response_cache = ResponseCache(
+            max_entries=cache_config.get("max_entries", 256),
+            ttl=cache_config.get("ttl_seconds", 3600))
+        faq_config = self.config.get("faq", {})
+        self.faq = None
+        if faq_config.get("enabled", True):
+            self.faq = FAQIndex(
+                faq_config.get("path") or os.path.join(data_dir, "faq.json"),
+                threshold=faq_config.get("threshold", 0.7))
+        self.speculation = None
+        if speech_config.get("speculative_queries", True):
+            self.speculation = SpeculativeQueryRunner(
+                self._generate_speculatively,
+                stability_window=speech_config.get("speculation_window", 0.6))
+        self.prefetcher = self._create_prefetcher()
 
-    def process_query(self, query: str) -> Dict[str, Any]:
+    def _create_prefetcher(self):
+        prefetch_config = self.config.get("prefetch", {})
+        if not prefetch_config.get("enabled", True):
+            return None
+        return FollowUpPrefetcher(
+            self._generate_prefetch,
+            self.response_cache,
+            key=self._query_key,
+            predictors=[self._history_followups, template_followups],
+            cpu_budget=prefetch_config.get("cpu_budget", 0.25),
+            idle_delay=prefetch_config.get("idle_delay", 2.0),
+            max_followups=prefetch_config.get("max_followups", 3))
+
+    def process_query(self, query: str, session_id: str = None, priority: str = "typed") -> Dict[str, Any]:
+        """Answer a question; `priority` is "voice" or "typed" (teacher sessions always go first)."""
         if not query or len(query.strip()) < 2:
             return self._format_response("Please ask a complete question", success=False)
 
+        if session_id in self.teacher_sessions:
+            priority = "teacher"
+        if self.prefetcher:
+            self.prefetcher.pause()
         try:
-            with self._processing_lock:
-                start_time = time.time()
+            with self.sessions.use(session_id) as session:
+                return self._answer(session, query, priority)
+        finally:
+            if self.prefetcher:
+                self.prefetcher.resume()
+
+    def _answer(self, session: Session, query: str, priority: str) -> Dict[str, Any]:
+        # Curated answers win over anything the model has said or would say
+        match = self.faq.lookup(query) if self.faq else None
+        if match is not None:
+            response = self._complete_query(session, query, match['answer'], 0.0)
+            response['cached'] = True
+            response['source'] = 'faq'
+            return response
+
+        key = self._query_key(query)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            response = self._complete_query(session, query, cached, 0.0)
+            response['cached'] = True
+            return response
 
-                response_text = self.models.generate_educational_response(query)
-                processing_time = time.time() - start_time
-                engagement = self.engagement_detector.last_status
+        # Speculation follows the local microphone, so only the default session can use it.
+        # Must run before queueing for the model: a matching speculation holds it while it finishes
+        speculative = None
+        if self.speculation and session.session_id == DEFAULT_SESSION:
+            speculative = self.speculation.take(query)
+        if speculative is not None:
+            return self._complete_query(session, query, speculative, 0.0, key)
 
-                return self._format_response(response_text, engagement)
+        try:
+            start_time = time.time()
+            # Identical questions arriving while one is queued or generating share its answer.
+            # Only within a priority class, so a teacher or voice query never waits in a lower
+            # class's queue; a leader turned away by the scheduler does not turn away the others
+            (response_text, is_fallback), shared = self.inflight.do(
+                key + (priority,), lambda: self._generate(query, priority, session.session_id),
+                retry_on=(QueryRejected,))
+            processing_time = time.time() - start_time
+            if shared and is_fallback:
+                # The fallback text quotes the question, so give each student their own wording
+                response_text = self.models._get_fallback_response(query)
+
+            return self._complete_query(session, query, response_text, processing_time, key)
 
+        except RateLimited as e:
+            self.logger.info(f"Query rejected: {e}")
+            return self._format_response("You're asking faster than I can answer. Please wait a moment.",
+                                         success=False)
+        except DeadlineExceeded as e:
+            self.logger.warning(f"Query dropped: {e}")
+            return self._format_response("I'm busy helping other students. Please ask again in a moment.",
+                                         success=False)
         except Exception as e:
             self.logger.error(f"Query processing failed: {e}")
-            return self._format_response("I'm having technical difficulties. Please try again later.", success=False)
+            return self._format_response("I'm having technical difficulties. Please try again later.",
+                                         success=False)
+
+    def _query_key(self, query: str):
+        # Includes the model and its settings, so answers never outlive a model swap
+        generation_config = getattr(self.models, 'generation_config', None)
+        settings = generation_config.to_json_string() if generation_config is not None else None
+        return normalize_query(query), getattr(self.models, 'model_name', None), settings
+
+    def _generate(self, query: str, priority: str, session_id: str):
+        with self.scheduler.slot(priority, session_id), self.governor.inference():
+            response_text = self.models.generate_educational_response(query, record_history=False)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Resource governor: {self.governor.state()}")
+        return response_text, response_text == self.models._get_fallback_response(query)
+
+    def _complete_query(self, session: Session, query: str, response_text: str,
+                        processing_time: float, cache_key=None) -> Dict[str, Any]:
+        engagement = self.session_engagement(session)
+        if response_text != self.models._get_fallback_response(query):
+            session.record_exchange(query, response_text)
+            self.interactions.append(query, response_text, processing_time, engagement,
+                                     session_id=session.session_id)
+            if cache_key is not None:
+                self.response_cache.put(cache_key, response_text)
+            if self.prefetcher:
+                self.prefetcher.schedule(query, response_text)
+        return self._format_response(response_text, engagement)
+
+    def _generate_prefetch(self, text: str, cancel_event: threading.Event):
+        answer = self._generate_speculatively(text, cancel_event, priority="background")
+        if answer is None or answer == self.models._get_fallback_response(text):
+            return None
+        return answer
+
+    def _history_followups(self, query: str, answer: str):
+        recent = self.interactions.recent(200)
+        return history_followups(query, ((row['session_id'], row['query']) for row in reversed(recent)))
+
+    def _create_engagement_detector(self):
+        # Imported here so headless use without engagement tracking never loads OpenCV
+        from .engagement import EngagementDetector
+
+        engagement_config = self.config.get("engagement", {})
+        return EngagementDetector(
+            log_dir=os.path.join(self.data_dir, "engagement"),
+            backend=engagement_config.get("detector", "haar"),
+            detector_options=engagement_config.get("detector_options"),
+            governor=self.governor)
+
+    @property
+    def engagement_status(self) -> str:
+        """Engagement seen by the room camera."""
+        return self.engagement_detector.last_status if self.engagement_detector else "Neutral"
+
+    def session_engagement(self, session: Session) -> str:
+        # Sessions without their own engagement feed fall back to the room camera
+        return session.engagement or self.engagement_status
+
+    def update_engagement(self, session_id: str, state: str):
+        with self.sessions.use(session_id) as session:
+            session.update_engagement(state)
+
+    @property
+    def student_profile(self) -> Dict[str, Any]:
+        return self.sessions.get().profile
+
+    def _generate_speculatively(self, text: str, cancel_event: threading.Event, priority: str = "voice"):
+        try:
+            # Not rate limited: a discarded speculation should not cost the student a question
+            with self.scheduler.slot(priority, DEFAULT_SESSION, rate_limited=False), self.governor.inference():
+                if cancel_event.is_set():
+                    return None
+                return self.models.generate_educational_response(text, cancel_event=cancel_event,
+                                                                 record_history=False)
+        except QueryRejected as e:
+            self.logger.debug(f"Background generation skipped: {e}")
+            return None
 
     def _format_response(self, text: str, engagement: str = None, success: bool = True) -> Dict[str, Any]:
         response = {
@@ -56,15 +250,47 @@ class ClassroomAssistant:
 
         return response
 
-    def start_voice_input(self, callback):
+    def update_learning_style(self, style: str, session_id: str = None):
+        self._update_profile(session_id, learning_style=style)
+
+    def update_difficulty_level(self, level: str, session_id: str = None):
+        self._update_profile(session_id, difficulty_level=level)
+
+    def _update_profile(self, session_id: str, **changes):
+        with self.sessions.use(session_id) as session:
+            session.profile.update(changes)
+            session.touch()
+            if session.session_id != DEFAULT_SESSION:
+                return
+            # The default session's profile is also the one in student_profile.json
+            try:
+                save_profile(session.profile, self.profile_path)
+            except OSError as e:
+                self.logger.error(f"Failed to save student profile: {e}")
+
+    def start_voice_input(self, callback, on_partial=None):
+        def handle_partial(text):
+            if self.speculation:
+                self.speculation.on_partial(text)
+            if on_partial:
+                on_partial(text)
+
         def voice_thread():
             with self._voice_lock:
+                text = None
+                # A student is speaking: keep the model free for the speculative answer
+                if self.prefetcher:
+                    self.prefetcher.pause()
                 try:
-                    text = self.models.voice_input()
-                    callback(text if text else None)
+                    text = self.models.voice_input(handle_partial)
                 except Exception as e:
                     self.logger.error(f"Voice processing error: {e}")
-                    callback(None)
+                finally:
+                    if self.prefetcher:
+                        self.prefetcher.resume()
+                if not text and self.speculation:
+                    self.speculation.cancel()
+                callback(text if text else None)
 
         if not self._voice_lock.locked():
             threading.Thread(target=voice_thread, daemon=True).start()
@@ -72,6 +298,23 @@ class ClassroomAssistant:
     def interrupt(self):
         self.models.interrupt()
 
-    def clear_conversation(self):
-        self.models.clear_history()
-        self.logger.info("Conversation history cleared")
+    def shutdown(self):
+        if self.prefetcher:
+            self.prefetcher.close()
+        self.models.close_audio()
+        if self.engagement_detector:
+            self.engagement_detector.close()
+        self.interactions.close()
+        self.logger.info(f"Sessions: {self.sessions.stats()}")
+        self.logger.info(f"Coalesced queries: {self.inflight.stats()}")
+        self.logger.info(f"Scheduler: {self.scheduler.stats()}")
+        if self.faq:
+            self.logger.info(f"FAQ: {self.faq.stats()}")
+        if self.prefetcher:
+            self.logger.info(f"Prefetch: {self.prefetcher.stats()}, cache: {self.response_cache.stats()}")
+        self.sessions.close()
+
+    def clear_conversation(self, session_id: str = None):
+        with self.sessions.use(session_id) as session:
+            session.clear_history()
+        self.logger.info(f"Conversation history cleared for session {session.session_id}")
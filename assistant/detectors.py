@@ -0,0 +1,152 @@
+import abc
+import inspect
+import logging
+import os
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+Box = Tuple[int, int, int, int]
+
+# Model files that do not ship with opencv-python live next to the package:
+#   lbpcascade_frontalface_improved.xml        (opencv/data/lbpcascades)
+#   deploy.prototxt                            (opencv/samples/dnn/face_detector)
+#   res10_300x300_ssd_iter_140000.caffemodel   (opencv_3rdparty, dnn_samples_face_detector_20170830)
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'face_detection')
+
+
+class FaceDetector(abc.ABC):
+    name = "base"
+
+    @abc.abstractmethod
+    def detect(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> List[Box]:
+        """Return face boxes as (x, y, w, h), most prominent first."""
+
+    def describe(self) -> Dict[str, object]:
+        return {'backend': self.name}
+
+
+class CascadeDetector(FaceDetector):
+    def __init__(self, cascade_path: str, scale_factor: float = 1.1, min_neighbors: int = 5,
+                 min_size: Tuple[int, int] = (30, 30)):
+        self.cascade_path = cascade_path
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = tuple(min_size)
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise RuntimeError(f"Failed to load face detection cascade: {cascade_path}")
+
+    def detect(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> List[Box]:
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size)
+        boxes = [tuple(int(v) for v in face) for face in faces]
+        boxes.sort(key=lambda box: box[2] * box[3], reverse=True)
+        return boxes
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            'backend': self.name,
+            'scale_factor': self.scale_factor,
+            'min_neighbors': self.min_neighbors,
+            'min_size': self.min_size
+        }
+
+
+class HaarCascadeDetector(CascadeDetector):
+    name = "haar"
+
+    def __init__(self, cascade_path: Optional[str] = None, **options):
+        super().__init__(cascade_path or cv2.data.haarcascades + 'haarcascade_frontalface_default.xml', **options)
+
+
+class LBPCascadeDetector(CascadeDetector):
+    name = "lbp"
+
+    def __init__(self, cascade_path: Optional[str] = None, **options):
+        super().__init__(cascade_path or os.path.join(MODEL_DIR, 'lbpcascade_frontalface_improved.xml'), **options)
+
+
+class DNNFaceDetector(FaceDetector):
+    name = "dnn"
+
+    def __init__(self, prototxt: Optional[str] = None, weights: Optional[str] = None,
+                 confidence: float = 0.5, input_size: Tuple[int, int] = (300, 300)):
+        self.prototxt = prototxt or os.path.join(MODEL_DIR, 'deploy.prototxt')
+        self.weights = weights or os.path.join(MODEL_DIR, 'res10_300x300_ssd_iter_140000.caffemodel')
+        self.confidence = confidence
+        self.input_size = tuple(input_size)
+        for path in (self.prototxt, self.weights):
+            if not os.path.exists(path):
+                raise RuntimeError(f"Missing face detection model file: {path}")
+        self.net = cv2.dnn.readNetFromCaffe(self.prototxt, self.weights)
+
+    def detect(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> List[Box]:
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1.0, self.input_size, (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+
+        faces = []
+        for score, x1, y1, x2, y2 in detections[detections[:, 2] >= self.confidence][:, 2:7]:
+            x1, y1 = max(0, int(x1 * w)), max(0, int(y1 * h))
+            x2, y2 = min(w, int(x2 * w)), min(h, int(y2 * h))
+            if x2 > x1 and y2 > y1:
+                faces.append((float(score), (x1, y1, x2 - x1, y2 - y1)))
+        faces.sort(key=lambda item: item[0], reverse=True)
+        return [box for _, box in faces]
+
+    def describe(self) -> Dict[str, object]:
+        return {'backend': self.name, 'confidence': self.confidence, 'input_size': self.input_size}
+
+
+DETECTOR_BACKENDS = {
+    HaarCascadeDetector.name: HaarCascadeDetector,
+    LBPCascadeDetector.name: LBPCascadeDetector,
+    DNNFaceDetector.name: DNNFaceDetector
+}
+
+
+def create_detector(backend: str = "haar", **options) -> FaceDetector:
+    """Options are either per backend ({"haar": {...}, "dnn": {...}}) or flat; flat options
+    the backend does not take (e.g. scale_factor for dnn) are logged and left out."""
+    try:
+        detector_cls = DETECTOR_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown face detector backend '{backend}'. Choose from: {', '.join(DETECTOR_BACKENDS)}")
+    if any(name in options for name in DETECTOR_BACKENDS):
+        options = dict(options.get(backend) or {})
+    accepted = _init_parameters(detector_cls)
+    ignored = sorted(key for key in options if key not in accepted)
+    if ignored:
+        logging.getLogger(__name__).warning(f"Face detector '{backend}' does not take {', '.join(ignored)}; ignoring")
+        options = {key: value for key, value in options.items() if key in accepted}
+    return detector_cls(**options)
+
+
+def _init_parameters(cls) -> set:
+    """Keyword arguments __init__ accepts, following **options up to the base class."""
+    accepted = set()
+    for klass in cls.__mro__:
+        if '__init__' not in vars(klass):
+            continue
+        params = inspect.signature(klass.__init__).parameters.values()
+        accepted.update(p.name for p in params if p.name != 'self' and p.kind is not inspect.Parameter.VAR_KEYWORD)
+        if not any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params):
+            break
+    return accepted
+
+
+def box_iou(a: Box, b: Box) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
@@ -0,0 +1,60 @@
+import time
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class FrameDisplay:
+    """Renders webcam frames into one Tk photo using buffers allocated once up front.
+
+    The RGBA buffer backs the PIL image directly (Image.frombuffer shares memory for RGBA),
+    so each frame is a resize + colour conversion into existing arrays and an in-place paste.
+    """
+
+    def __init__(self, label, size: Tuple[int, int] = (320, 240)):
+        width, height = size
+        self.label = label
+        self.size = size
+        self.resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgba = np.empty((height, width, 4), dtype=np.uint8)
+        self._image = Image.frombuffer('RGBA', size, self._rgba, 'raw', 'RGBA', 0, 1)
+        self._photo = None
+        self.frames = 0
+        self.skipped = 0
+        self.cpu_time = 0.0
+
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        if frame.shape[1::-1] == self.size:
+            self.resized[:] = frame
+        else:
+            cv2.resize(frame, self.size, dst=self.resized)
+        return self.resized
+
+    def prepare(self, frame: np.ndarray) -> Image.Image:
+        if frame is not self.resized:
+            frame = self.resize(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+        return self._image
+
+    def render(self, frame: np.ndarray):
+        start = time.process_time()
+        image = self.prepare(frame)
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage(image=image)
+            self.label.config(image=self._photo)
+        else:
+            self._photo.paste(image)
+        self.frames += 1
+        self.cpu_time += time.process_time() - start
+
+    def skip(self):
+        self.skipped += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'cpu_ms_per_frame': self.cpu_time / self.frames * 1000 if self.frames else 0.0
+        }
@@ -1,11 +1,16 @@
 import cv2
 import numpy as np
 import logging
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from .detectors import FaceDetector, create_detector
+from .engagement_log import EngagementLogWriter
 
 class EngagementDetector:
-    def __init__(self):
+    def __init__(self, log_dir: Optional[str] = "data/engagement", backend: str = "haar",
+                 detector_options: Optional[Dict[str, Any]] = None, governor=None):
         self.logger = logging.getLogger(__name__)
         self.emotion_map = {
             0: {'icon': '😊', 'state': 'Engaged', 'color': '#4CAF50'},
@@ -14,32 +19,47 @@ class EngagementDetector:
             3: {'icon': '😞', 'state': 'Struggling', 'color': '#F44336'},
             4: {'icon': '😐', 'state': 'Neutral', 'color': '#9E9E9E'}
         }
-        self.face_cascade = self._load_cascade()
+        self.governor = governor
+        self.face_detector = self._load_detector(backend, detector_options or {})
         self.last_status = "Neutral"
-        self.engagement_history = []
-        
-    def _load_cascade(self):
+        self.last_faces = []
+        self.engagement_history = deque(maxlen=100)
+        self.session_log = self._open_session_log(log_dir)
+
+    def _load_detector(self, backend: str, options: Dict[str, Any]) -> FaceDetector:
         try:
-            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            cascade = cv2.CascadeClassifier(cascade_path)
-            if cascade.empty():
-                raise RuntimeError("Failed to load face detection cascade")
-            return cascade
+            detector = create_detector(backend, **options)
+            self.logger.info(f"Face detection backend: {detector.describe()}")
+            return detector
         except Exception as e:
             self.logger.error(f"Failed to load face detection: {e}")
             raise RuntimeError("Could not initialize engagement tracking")
 
+    def _open_session_log(self, log_dir: Optional[str]) -> Optional[EngagementLogWriter]:
+        if not log_dir:
+            return None
+        try:
+            return EngagementLogWriter(log_dir)
+        except OSError as e:
+            self.logger.warning(f"Engagement history will not be saved: {e}")
+            return None
+
     def analyze_frame(self, frame: np.ndarray) -> Dict[str, Any]:
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30))
-            
+            start = time.perf_counter()
+            scale = self.governor.analysis_scale() if self.governor else 1.0
+            if scale < 1.0:
+                small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                faces = [tuple(int(v / scale) for v in face) for face in self.face_detector.detect(small)]
+            else:
+                faces = self.face_detector.detect(frame)
+            self.last_faces = faces
+            if self.governor:
+                self.governor.record_frame(time.perf_counter() - start)
+
             if len(faces) == 0:
                 self.last_status = "Neutral"
+                self._record_engagement("Neutral")
                 return self.emotion_map[4]
             
             (x, y, w, h) = faces[0]
@@ -62,9 +82,19 @@ class EngagementDetector:
             self.logger.error(f"Engagement analysis failed: {e}")
             return self.emotion_map[4]
 
+    def update_status(self, state: str):
+        """Adopt a state computed elsewhere, e.g. the merged room view of several cameras."""
+        self.last_status = state
+        self._record_engagement(state)
+
     def _record_engagement(self, state: str):
         self.engagement_history.append({
             "timestamp": datetime.now().isoformat(),
             "state": state
         })
-        self.engagement_history = self.engagement_history[-100:]
\ No newline at end of file
+        if self.session_log:
+            self.session_log.append(state)
+
+    def close(self):
+        if self.session_log:
+            self.session_log.close()
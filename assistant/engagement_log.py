@@ -0,0 +1,167 @@
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Segment layout: 16-byte header followed by fixed-size little-endian records
+# of (unix timestamp: float64, state code: uint8). Records are only ever appended,
+# and timestamps are kept monotonic so readers can binary search them.
+MAGIC = b'ENGLOG01'
+HEADER = struct.Struct('<8sII')
+RECORD = struct.Struct('<dB')
+RECORD_DTYPE = np.dtype([('ts', '<f8'), ('state', 'u1')])
+SEGMENT_SUFFIX = '.englog'
+
+STATE_CODES = {
+    'Engaged': 0,
+    'Thinking': 1,
+    'Confused': 2,
+    'Struggling': 3,
+    'Neutral': 4
+}
+STATE_NAMES = {code: state for state, code in STATE_CODES.items()}
+
+
+class EngagementLogWriter:
+    def __init__(self, log_dir: str = "data/engagement", session_id: Optional[str] = None,
+                 flush_interval: float = 1.0, batch_size: int = 256, max_queue: int = 10000):
+        self.logger = logging.getLogger(__name__)
+        self.session_id = session_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join(log_dir, f"session_{self.session_id}{SEGMENT_SUFFIX}")
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._last_ts = 0.0
+        self._closed = False
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, 1, RECORD.size))
+            self._file.flush()
+
+        self._thread = threading.Thread(target=self._run, name="engagement-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, state: str, timestamp: Optional[float] = None):
+        """Queue one event without blocking; events are dropped if the writer falls behind."""
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait((timestamp or time.time(), STATE_CODES.get(state, STATE_CODES['Neutral'])))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        batch = bytearray()
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not self:
+                ts, code = item
+                self._last_ts = ts = max(ts, self._last_ts)
+                batch += RECORD.pack(ts, code)
+                pending += 1
+
+            due = time.monotonic() - last_flush >= self.flush_interval
+            if pending and (pending >= self.batch_size or due or item is self):
+                self._write(batch, pending)
+                batch = bytearray()
+                pending = 0
+            if due or item is self:
+                last_flush = time.monotonic()
+            if item is self:
+                break
+
+    def _write(self, batch: bytearray, count: int):
+        try:
+            self._file.write(batch)
+            self._file.flush()
+            self.written += count
+        except OSError as e:
+            self.dropped += count
+            self.logger.error(f"Engagement log write failed: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self)
+        self._thread.join(timeout=5)
+        self._file.close()
+
+
+class EngagementLogReader:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f"Not an engagement log segment: {path}")
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _version, record_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or record_size != RECORD_DTYPE.itemsize:
+            self.close()
+            raise ValueError(f"Not an engagement log segment: {path}")
+
+        # A torn trailing record from an unclean shutdown is ignored
+        count = (size - HEADER.size) // RECORD_DTYPE.itemsize
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _slice(self, start: Optional[float], end: Optional[float]) -> np.ndarray:
+        ts = self.records['ts']
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+        return self.records[lo:hi]
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None,
+              state: Optional[str] = None) -> List[Tuple[float, str]]:
+        """Return (timestamp, state) events with start <= timestamp < end."""
+        window = self._slice(start, end)
+        if state is not None:
+            window = window[window['state'] == STATE_CODES[state]]
+        return [(float(ts), STATE_NAMES[int(code)]) for ts, code in window]
+
+    def count_by_state(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, int]:
+        counts = np.bincount(self._slice(start, end)['state'], minlength=len(STATE_NAMES))
+        return {STATE_NAMES[code]: int(counts[code]) for code in STATE_NAMES}
+
+    def close(self):
+        self.records = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Callers still hold views into the segment; the map is released with them
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_segments(log_dir: str = "data/engagement") -> List[str]:
+    if not os.path.isdir(log_dir):
+        return []
+    return sorted(os.path.join(log_dir, name) for name in os.listdir(log_dir) if name.endswith(SEGMENT_SUFFIX))
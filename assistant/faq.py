@@ -0,0 +1,270 @@
+import difflib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .text import normalize_query
+
+# Question scaffolding; what is left has to appear in the matched phrasing
+_STOPWORDS = frozenset("""
+    a an the is are was were be been do does did what what's whats who whom whose which when where why
+    how can could would should will shall may might i me my we our you your it its they them their this
+    that these those of to in on at for from by with about into and or if so than then there please tell
+    explain describe define mean meaning means
+""".split())
+
+
+def char_ngrams(text: str, n: int = 3) -> Counter:
+    """Character n-grams of the normalized text, padded so word starts and ends count."""
+    padded = f" {normalize_query(text)} "
+    return Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def content_words(text: str) -> List[str]:
+    return [word for word in normalize_query(text).split() if word not in _STOPWORDS and len(word) > 1]
+
+
+def covers(phrasing: str, query: str, similarity: float = 0.75) -> bool:
+    """True if every content word of the query is in the phrasing, allowing for typos and plurals."""
+    words = content_words(phrasing)
+    return all(any(difflib.SequenceMatcher(None, wanted, word).ratio() >= similarity for word in words)
+               for wanted in content_words(query))
+
+
+class _Index(NamedTuple):
+    """One immutable snapshot of the FAQ index; a reload builds a new one and swaps it in."""
+    docs: Dict[str, Tuple[int, np.ndarray, np.ndarray, Dict[str, Any]]]  # phrasing -> (id, grams, tf, entry)
+    keys: List[Optional[str]]  # doc id -> phrasing, None once removed
+    vocab: Dict[str, int]  # trigram -> gram id
+    postings: Dict[int, Tuple[np.ndarray, np.ndarray]]  # gram id -> (doc ids, tf)
+    df: np.ndarray
+    idf: np.ndarray
+    norms: np.ndarray
+
+
+_EMPTY_INDEX = _Index({}, [], {}, {}, np.zeros(0), np.zeros(0), np.zeros(0))
+
+
+class FAQIndex:
+    """Fuzzy lookup of curated answers by question.
+
+    Questions (and their alternate phrasings) are indexed as character-trigram vectors with
+    sublinear tf and idf weights; lookup returns the best entry by cosine similarity. Rare
+    trigrams select candidates through an inverted index and only those are scored exactly,
+    so a lookup touches at most `posting_budget` postings however large the FAQ grows. Both
+    steps run on numpy arrays. A match must also contain every content word of the query:
+    "how do I subtract fractions" shares most trigrams with "how do I add fractions" but is
+    a different question.
+
+    The FAQ file is a JSON list of {"question", "answer", "alternates"} objects. When its
+    modification time changes, a background thread builds a new index and swaps it in;
+    lookups keep using the current one meanwhile. Only added or removed phrasings are
+    re-tokenized and only their posting lists are rebuilt, but idf depends on the number of
+    phrasings, so idf and the document norms are recomputed over the whole index.
+    """
+
+    def __init__(self, path: str = "data/faq.json", threshold: float = 0.7, check_interval: float = 2.0,
+                 max_candidates: int = 32, posting_budget: int = 2048):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.threshold = threshold
+        self.check_interval = check_interval
+        self.max_candidates = max_candidates
+        self.posting_budget = posting_budget
+        self._lock = threading.Lock()
+        self._index = _EMPTY_INDEX
+        self._mtime = None
+        self._next_check = 0.0
+        self._reloading = True
+        self.lookups = 0
+        self.hits = 0
+        self._reload()
+
+    def __len__(self) -> int:
+        return len(self._index.docs)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check or self._reloading:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                mtime = None
+            if mtime == self._mtime:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="faq-reload", daemon=True).start()
+
+    def _read_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Every phrasing in the file, keyed by its normalized text."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        phrasings = {}
+        for entry in entries:
+            for question in [entry['question']] + list(entry.get('alternates', [])):
+                key = normalize_query(question)
+                if key:
+                    phrasings[key] = entry
+        return phrasings
+
+    def _reload(self):
+        # Only one reload runs at a time: _reloading is set by whoever started it
+        try:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                phrasings = self._read_entries()
+            except FileNotFoundError:
+                mtime, phrasings = None, {}
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.logger.error(f"Could not load FAQ from {self.path}: {e}")
+                return
+
+            start = time.perf_counter()
+            old = self._index
+            removed = [key for key in old.docs if key not in phrasings]
+            added = [key for key in phrasings if key not in old.docs]
+            if removed or added:
+                if len(old.keys) - len(old.docs) + len(removed) > len(phrasings):
+                    # Mostly removed ids: renumber from scratch instead
+                    old, removed, added = _EMPTY_INDEX, [], list(phrasings)
+                index = self._updated(old, phrasings, removed, added)
+            else:
+                # Answers of unchanged phrasings may have been edited, so every entry is refreshed
+                index = old._replace(docs={key: old.docs[key][:3] + (entry,) for key, entry in phrasings.items()})
+            with self._lock:
+                self._index = index
+                self._mtime = mtime
+            if removed or added:
+                self.logger.info(f"FAQ index: +{len(added)} -{len(removed)} phrasings, {len(index.docs)} total "
+                                 f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+        finally:
+            self._reloading = False
+
+    @staticmethod
+    def _updated(old: _Index, phrasings: Dict[str, Dict[str, Any]], removed: List[str], added: List[str]) -> _Index:
+        # Copy on write: the vocabulary and key list are copied, and only the posting lists
+        # of trigrams in added or removed phrasings are rebuilt
+        vocab = dict(old.vocab)
+        keys = list(old.keys)
+        new_docs = {}
+        additions: Dict[int, Tuple[List[int], List[float]]] = {}
+        for key in added:
+            counts = char_ngrams(key)
+            gram_ids = np.array([vocab.setdefault(gram, len(vocab)) for gram in counts], dtype=np.int64)
+            tf = np.array([1 + math.log(count) for count in counts.values()])
+            doc_id = len(keys)
+            keys.append(key)
+            new_docs[key] = (doc_id, gram_ids, tf)
+            for gram_id, weight in zip(gram_ids.tolist(), tf.tolist()):
+                doc_ids, weights = additions.setdefault(gram_id, ([], []))
+                doc_ids.append(doc_id)
+                weights.append(weight)
+        removals: Dict[int, List[int]] = {}
+        for key in removed:
+            doc_id, gram_ids = old.docs[key][:2]
+            keys[doc_id] = None
+            for gram_id in gram_ids.tolist():
+                removals.setdefault(gram_id, []).append(doc_id)
+
+        postings = dict(old.postings)
+        for gram_id in removals.keys() | additions.keys():
+            doc_ids, tf = postings.get(gram_id, (np.zeros(0, dtype=np.int64), np.zeros(0)))
+            if gram_id in removals:
+                keep = ~np.isin(doc_ids, removals[gram_id])
+                doc_ids, tf = doc_ids[keep], tf[keep]
+            if gram_id in additions:
+                doc_ids = np.concatenate([doc_ids, np.array(additions[gram_id][0], dtype=np.int64)])
+                tf = np.concatenate([tf, additions[gram_id][1]])
+            if len(doc_ids):
+                postings[gram_id] = (doc_ids, tf)
+            else:
+                postings.pop(gram_id, None)
+
+        docs = {key: (old.docs[key][:3] if key in old.docs else new_docs[key]) + (entry,)
+                for key, entry in phrasings.items()}
+        # idf changes with the number of phrasings, so it and the norms are recomputed for all
+        df = np.zeros(len(vocab))
+        for gram_id, (doc_ids, _) in postings.items():
+            df[gram_id] = len(doc_ids)
+        idf = np.log((len(docs) + 1) / (df + 1)) + 1
+        if postings:
+            gram_ids = list(postings)
+            all_docs = np.concatenate([postings[gram_id][0] for gram_id in gram_ids])
+            all_weights = np.concatenate([postings[gram_id][1] * idf[gram_id] for gram_id in gram_ids])
+            norms = np.sqrt(np.bincount(all_docs, all_weights * all_weights, minlength=len(keys)))
+        else:
+            norms = np.zeros(len(keys))
+        return _Index(docs, keys, vocab, postings, df, idf, norms)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best matching FAQ entry with its score, or None below the threshold."""
+        self._maybe_reload()
+        match = self.best_match(query)
+        self.lookups += 1
+        if match is None or match['score'] < self.threshold or not covers(match['phrasing'], query):
+            return None
+        self.hits += 1
+        return match
+
+    def best_match(self, query: str) -> Optional[Dict[str, Any]]:
+        grams = char_ngrams(query)
+        index = self._index
+        if not grams or not index.docs:
+            return None
+        known = [(index.vocab[gram], 1 + math.log(count)) for gram, count in grams.items() if gram in index.vocab]
+        if not known:
+            return None
+        # Trigrams no phrasing has still count towards the query norm, at the highest idf
+        default_idf = math.log(len(index.docs) + 1) + 1
+        unknown = sum((1 + math.log(count)) ** 2 for gram, count in grams.items() if gram not in index.vocab)
+        query_grams = np.array([gram_id for gram_id, _ in known], dtype=np.int64)
+        query_weights = np.array([tf for _, tf in known]) * index.idf[query_grams]
+        query_norm = math.sqrt(float(query_weights @ query_weights) + unknown * default_idf ** 2)
+        # A document's tf times this gives its term of the dot product
+        scale = query_weights * index.idf[query_grams]
+
+        # Candidates come from the rarest trigrams first, until the posting budget is spent;
+        # common trigrams would touch most of the index and barely change the ranking
+        df = index.df[query_grams]
+        rarest = np.argsort(df, kind='stable')
+        # The vocabulary only grows, so trigrams of removed phrasings may have no postings
+        rarest = rarest[df[rarest] > 0]
+        if not len(rarest):
+            return None
+        spent = np.cumsum(df[rarest])
+        rarest = rarest[:max(1, int(np.searchsorted(spent, self.posting_budget, side='right')))]
+        postings = [index.postings[gram_id] for gram_id in query_grams[rarest].tolist()]
+        doc_ids, slots = np.unique(np.concatenate([ids for ids, _ in postings]), return_inverse=True)
+        partial = np.bincount(slots, np.concatenate([tf * scale[i] for i, (_, tf) in zip(rarest, postings)]))
+        if len(doc_ids) > self.max_candidates:
+            doc_ids = doc_ids[np.argpartition(partial, -self.max_candidates)[-self.max_candidates:]]
+
+        # Exact cosine over every query trigram for the candidates
+        dense = np.zeros(len(index.vocab))
+        dense[query_grams] = scale
+        docs = [index.docs[index.keys[doc_id]] for doc_id in doc_ids.tolist()]
+        starts = np.cumsum([0] + [len(doc[1]) for doc in docs[:-1]])
+        dots = np.add.reduceat(np.concatenate([doc[2] * dense[doc[1]] for doc in docs]), starts)
+        scores = dots / (query_norm * index.norms[doc_ids])
+        best = int(np.argmax(scores))
+        entry = docs[best][3]
+        return {'question': entry['question'], 'answer': entry['answer'], 'phrasing': index.keys[doc_ids[best]],
+                'score': float(scores[best])}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'phrasings': len(self),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0
+        }
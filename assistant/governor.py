@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+# Throttle levels for webcam analysis, from full rate to heavily throttled
+LEVELS = [
+    {'interval': 0.1, 'scale': 1.0},
+    {'interval': 0.2, 'scale': 0.75},
+    {'interval': 0.5, 'scale': 0.5},
+    {'interval': 1.0, 'scale': 0.5}
+]
+
+
+class ResourceGovernor:
+    """Shares the CPU between webcam analysis and model decoding.
+
+    While a query is in flight analysis runs at `busy_level`, otherwise at `idle_level`.
+    The busy level is tuned from the decode speed measured at each level: it probes
+    harder throttling while that still buys tokens/s, and relaxes when it stops helping.
+    The idle level backs off when frame analysis can no longer keep up with its interval.
+    """
+
+    def __init__(self, busy_level: int = 1, tolerance: float = 0.1, frame_budget: float = 0.5, smoothing: float = 0.3):
+        self.logger = logging.getLogger(__name__)
+        self.tolerance = tolerance
+        self.frame_budget = frame_budget
+        self.smoothing = smoothing
+        self.idle_level = 0
+        self.busy_level = busy_level
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._tps_by_level = {}
+        self.decode_tps = None
+        self.frame_latency = None
+
+    @contextmanager
+    def inference(self):
+        with self._lock:
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    @property
+    def level(self) -> int:
+        return self.busy_level if self._inflight else self.idle_level
+
+    def frame_interval(self) -> float:
+        return LEVELS[self.level]['interval']
+
+    def analysis_scale(self) -> float:
+        return LEVELS[self.level]['scale']
+
+    def _smooth(self, previous, value: float) -> float:
+        return value if previous is None else previous + self.smoothing * (value - previous)
+
+    def record_decode(self, tokens: int, seconds: float):
+        if tokens <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            level = self.busy_level
+            tps = self._smooth(self._tps_by_level.get(level), tokens / seconds)
+            self._tps_by_level[level] = tps
+            self.decode_tps = tps
+
+            best = max(self._tps_by_level.values())
+            lighter = self._tps_by_level.get(level - 1)
+            if lighter is not None and lighter >= tps * (1 - self.tolerance):
+                # The lighter level decodes about as fast, so give the camera its frames back
+                self.busy_level = level - 1
+            elif level < len(LEVELS) - 1 and (tps < best * (1 - self.tolerance) or level + 1 not in self._tps_by_level):
+                # Decoding is slower than it has been, or the next level has not been tried yet
+                self.busy_level = level + 1
+            if self.busy_level != level:
+                self.logger.info(f"Busy analysis level {level} -> {self.busy_level} at {tps:.1f} tokens/s")
+
+    def record_frame(self, latency: float):
+        with self._lock:
+            self.frame_latency = self._smooth(self.frame_latency, latency)
+            if self._inflight:
+                return
+            level = self.idle_level
+            if self.frame_latency > LEVELS[level]['interval'] * self.frame_budget and level < len(LEVELS) - 1:
+                self.idle_level = level + 1
+            elif level > 0 and self.frame_latency < LEVELS[level - 1]['interval'] * self.frame_budget / 2:
+                self.idle_level = level - 1
+
+    def state(self) -> Dict[str, Any]:
+        level = self.level
+        return {
+            'inflight': self._inflight,
+            'level': level,
+            'idle_level': self.idle_level,
+            'busy_level': self.busy_level,
+            'frame_interval': LEVELS[level]['interval'],
+            'analysis_scale': LEVELS[level]['scale'],
+            'decode_tps': self.decode_tps,
+            'frame_latency_ms': self.frame_latency * 1000 if self.frame_latency is not None else None,
+            'timestamp': time.time()
+        }
@@ -0,0 +1,236 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+_COLUMNS = ('timestamp', 'query', 'response', 'processing_time', 'engagement', 'rating', 'session_id')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    query TEXT NOT NULL,
+    response TEXT,
+    processing_time REAL,
+    engagement TEXT,
+    rating INTEGER,
+    session_id TEXT,
+    legacy_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_engagement ON interactions(engagement, timestamp);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('interactions', 0);
+"""
+
+_INSERT = f"INSERT INTO interactions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+# Imported rows carry a key derived from the record, so importing the same records twice is a no-op
+_IMPORT = (f"INSERT OR IGNORE INTO interactions ({', '.join(_COLUMNS)}, legacy_key) "
+           f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})")
+
+
+class InteractionStore:
+    """Append-only log of student interactions in SQLite (WAL mode).
+
+    Appends only enqueue; a background thread commits them in batches. The row count is kept
+    in a counter table updated in the same transaction, so it never needs a table scan.
+    Compaction checkpoints the WAL; it only deletes rows (the oldest beyond `max_rows`) when
+    a retention limit is configured.
+    """
+
+    def __init__(self, db_path: str = "data/interactions.db", batch_size: int = 64,
+                 flush_interval: float = 1.0, max_rows: Optional[int] = None, compact_every: int = 1000):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.compact_every = compact_every
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(interactions)")}
+            if 'session_id' not in columns:
+                conn.execute("ALTER TABLE interactions ADD COLUMN session_id TEXT")
+            if 'legacy_key' not in columns:
+                conn.execute("ALTER TABLE interactions ADD COLUMN legacy_key TEXT")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_interactions_legacy_key "
+                         "ON interactions(legacy_key) WHERE legacy_key IS NOT NULL")
+            self._committed = conn.execute(
+                "SELECT value FROM counters WHERE name = 'interactions'").fetchone()[0]
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._pending = 0
+        self.failed = 0
+        self._count_lock = threading.Lock()
+        self._since_compact = 0
+        self._writer = threading.Thread(target=self._write_loop, name="InteractionStore", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def append(self, query: str, response: Optional[str], processing_time: Optional[float] = None,
+               engagement: Optional[str] = None, rating: Optional[int] = None,
+               timestamp: Optional[str] = None, session_id: Optional[str] = None):
+        """Queue one interaction; never blocks on disk."""
+        row = (timestamp or datetime.now().isoformat(), query, response, processing_time, engagement, rating,
+               session_id)
+        with self._count_lock:
+            self._pending += 1
+        self._queue.put(row)
+
+    def count(self) -> int:
+        """Interactions stored or queued, without touching the database."""
+        with self._count_lock:
+            return self._committed + self._pending
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM interactions ORDER BY id DESC LIMIT ?", (limit,))
+
+    def since(self, timestamp: str, limit: int = 1000) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM interactions WHERE timestamp >= ? ORDER BY timestamp LIMIT ?",
+                           (timestamp, limit))
+
+    def by_engagement(self, engagement: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM interactions WHERE engagement = ? ORDER BY timestamp DESC LIMIT ?",
+                           (engagement, limit))
+
+    def engagement_counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT engagement, COUNT(*) FROM interactions GROUP BY engagement").fetchall()
+        return {row[0] or "Unknown": row[1] for row in rows}
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def import_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Bulk-load existing records (e.g. a legacy interaction_history) in one transaction.
+
+        Records already imported (same timestamp and query) are skipped, so an import that
+        failed part-way can simply be repeated.
+        """
+        rows = [tuple(record.get(column) for column in _COLUMNS) for record in records
+                if record.get('query') is not None]
+        rows = [row + (f"{row[0]}|{row[1]}" if row[0] else None,) for row in rows]
+        rows = [(row[0] or datetime.now().isoformat(),) + row[1:] for row in rows]
+        if rows:
+            with self._count_lock:
+                self._pending += len(rows)
+            self._queue.put(('import', rows))
+        return len(rows)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is written; False if any of it failed to commit."""
+        with self._count_lock:
+            failed_before = self.failed
+        marker = threading.Event()
+        self._queue.put(marker)
+        if not marker.wait(timeout):
+            return False
+        # Rows queued before the marker are committed (or failed) before it is set
+        with self._count_lock:
+            return self.failed == failed_before
+
+    def compact(self):
+        """Truncate the WAL (and drop rows beyond `max_rows`, if set); runs on the writer thread."""
+        self._queue.put('compact')
+
+    def _write_loop(self):
+        conn = self._connect()
+        stop = False
+        try:
+            while not stop:
+                batch, imports, markers, compact = [], [], [], False
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        markers.append(item)
+                    elif item == 'compact':
+                        compact = True
+                    elif item[0] == 'import':
+                        imports.append(item[1])
+                    else:
+                        batch.append(item)
+                    if stop or markers or imports or len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    self._commit(conn, batch)
+                for rows in imports:
+                    self._commit(conn, rows, _IMPORT)
+                if compact or self._since_compact >= self.compact_every:
+                    self._compact(conn)
+                for marker in markers:
+                    marker.set()
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[tuple], sql: str = _INSERT):
+        try:
+            with conn:
+                inserted = conn.executemany(sql, batch).rowcount
+                conn.execute("UPDATE counters SET value = value + ? WHERE name = 'interactions'", (inserted,))
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to write {len(batch)} interactions: {e}")
+            with self._count_lock:
+                self._pending -= len(batch)
+                self.failed += len(batch)
+            return
+        with self._count_lock:
+            self._pending -= len(batch)
+            self._committed += inserted
+        self._since_compact += inserted
+
+    def _compact(self, conn: sqlite3.Connection):
+        self._since_compact = 0
+        excess = 0
+        try:
+            with conn:
+                if self.max_rows is not None:
+                    excess = conn.execute(
+                        "SELECT value FROM counters WHERE name = 'interactions'").fetchone()[0] - self.max_rows
+                if excess > 0:
+                    conn.execute("DELETE FROM interactions WHERE id IN "
+                                 "(SELECT id FROM interactions ORDER BY id LIMIT ?)", (excess,))
+                    conn.execute("UPDATE counters SET value = value - ? WHERE name = 'interactions'", (excess,))
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            self.logger.warning(f"Interaction store compaction failed: {e}")
+            return
+        if excess > 0:
+            with self._count_lock:
+                self._committed -= excess
+            self.logger.warning(f"Retention limit of {self.max_rows} interactions: "
+                                f"deleted the {excess} oldest from {self.db_path}")
+
+    def close(self, timeout: float = 5.0):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout)
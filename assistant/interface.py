@@ -1,10 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, Menu
-from PIL import Image, ImageTk
 import cv2
 import logging
 import threading
-import pyttsx3
+from .capture import open_capture
+from .display import FrameDisplay
+from .multicam import MultiCameraManager
+from .phrases import (WELCOME, LISTENING, NOT_HEARD, LEARNING_TIPS, REPHRASE, TECHNICAL_DIFFICULTIES,
+                      CONVERSATION_CLEARED, FIXED_PHRASES)
+from .transcript import TranscriptArchive
+from .speech import PhraseCache, SpeechWorker, PRIORITY_ANSWER, PRIORITY_PROMPT, PRIORITY_TIP
 
 class ClassroomUI:
     def __init__(self, root, assistant):
@@ -12,23 +17,38 @@ class ClassroomUI:
         self.assistant = assistant
         self.voice_active = False
         self.processing = False
+        self.cameras = None
         self.cap = self._initialize_webcam()
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
-        self.engine.setProperty('volume', 0.9)
+        self.tts = SpeechWorker(rate=150, volume=0.9, cache=self._create_phrase_cache())
+        self.tts.prerender(FIXED_PHRASES)
         self.setup_ui()
         self.update_webcam()
         self._setup_styles()
         self._create_menu()
         
     def _initialize_webcam(self):
+        engagement_config = self.assistant.config.get("engagement", {})
+        sources = engagement_config.get("video_sources") or [0]
+        if len(sources) > 1:
+            cameras = MultiCameraManager(
+                sources,
+                self.assistant.engagement_detector.emotion_map,
+                governor=self.assistant.governor,
+                capture_options=engagement_config.get("capture"),
+                detector_kwargs={
+                    'backend': engagement_config.get("detector", "haar"),
+                    'detector_options': engagement_config.get("detector_options")
+                })
+            if cameras.start():
+                self.cameras = cameras
+                return None
+            cameras.stop()
+            logging.warning("No configured video source could be opened")
+
         try:
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
+            cap = open_capture(sources[0], engagement_config.get("capture"))
+            if cap is None:
                 logging.warning("Could not open webcam")
-                return None
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             return cap
         except Exception as e:
             logging.error(f"Webcam error: {e}")
@@ -55,6 +75,7 @@ class ClassroomUI:
         settings_menu = Menu(menubar, tearoff=0)
         settings_menu.add_command(label="Learning Style", command=self._show_learning_style_dialog)
         settings_menu.add_command(label="Difficulty Level", command=self._show_difficulty_dialog)
+        settings_menu.add_command(label="Switch Model...", command=self._show_model_dialog)
         settings_menu.add_separator()
         settings_menu.add_command(label="Clear Conversation", command=self.clear_conversation)
         settings_menu.add_command(label="View Profile", command=self._show_profile)
@@ -113,6 +134,44 @@ class ClassroomUI:
         
         ttk.Button(dialog, text="Save", command=save, style='Primary.TButton').pack(pady=10)
         
+    def _show_model_dialog(self):
+        models = self.assistant.models
+        if not hasattr(models, "swap_model"):
+            messagebox.showinfo("Switch Model", "This model backend cannot be switched while running")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Switch Model")
+        dialog.geometry("360x150")
+        
+        ttk.Label(dialog, text="Hugging Face model name or local path:").pack(pady=10)
+        
+        name_var = tk.StringVar(value=models.model_name)
+        entry = ttk.Entry(dialog, textvariable=name_var, width=40)
+        entry.pack(padx=20)
+        entry.focus_set()
+        
+        def load():
+            model_name = name_var.get().strip()
+            dialog.destroy()
+            if not model_name or model_name == models.model_name:
+                return
+            self.add_message("System", f"Loading {model_name} in the background; "
+                                       f"{models.model_name} keeps answering", 'system')
+            # The load runs on the swap thread; the report is shown back on the Tk thread
+            models.swap_model(model_name, on_done=lambda report: self.root.after(0, self._report_swap, report))
+        
+        entry.bind('<Return>', lambda event: load())
+        ttk.Button(dialog, text="Load", command=load, style='Primary.TButton').pack(pady=10)
+
+    def _report_swap(self, report):
+        if report.get('success'):
+            self.add_message("System", f"Now using {report['model']} (loaded in {report['load_seconds']:.1f}s)",
+                             'system')
+        else:
+            self.add_message("System", f"Could not load {report['model']}: {report.get('error')}", 'error')
+            messagebox.showerror("Switch Model", f"Could not load {report['model']}:\n{report.get('error')}")
+        
     def _show_profile(self):
         profile = self.assistant.student_profile
         
@@ -130,7 +189,7 @@ class ClassroomUI:
         ttk.Label(frame, text=profile.get("difficulty_level", "Not set").replace("_", " ").title()).grid(row=1, column=1, sticky='w')
         
         ttk.Label(frame, text="Total Interactions:", font=('Segoe UI', 10, 'bold')).grid(row=2, column=0, sticky='w')
-        ttk.Label(frame, text=str(len(profile.get("interaction_history", [])))).grid(row=2, column=1, sticky='w')
+        ttk.Label(frame, text=str(self.assistant.interactions.count())).grid(row=2, column=1, sticky='w')
         
         ttk.Button(dialog, text="Close", command=dialog.destroy).pack(pady=10)
 
@@ -168,8 +227,11 @@ class ClassroomUI:
         self.webcam_label = ttk.Label(engagement_frame)
         self.webcam_label.pack()
         
+        self.display = FrameDisplay(self.webcam_label, (320, 240))
+        
         self.engagement_label = ttk.Label(engagement_frame, text="Status: Analyzing...", font=('Segoe UI', 11), anchor='center')
         self.engagement_label.pack(fill=tk.X, pady=10)
+        self._engagement_label_state = None
         
         # Right panel - Learning interface
         right_frame = ttk.Frame(main_frame)
@@ -180,9 +242,10 @@ class ClassroomUI:
         
         # Chat history with scrollbar
         self.chat_history = scrolledtext.ScrolledText(
-            chat_frame, wrap=tk.WORD, font=('Segoe UI', 11), padx=15, pady=15, bg='white', relief=tk.FLAT, state='disabled'
+            chat_frame, wrap=tk.WORD, font=('Segoe UI', 11), padx=15, pady=15, bg='white', relief=tk.FLAT
         )
         self.chat_history.pack(fill=tk.BOTH, expand=True)
+        self._setup_transcript()
         
         # Configure tags for message styling
         self.chat_history.tag_config('assistant', foreground='#2c3e50')
@@ -207,23 +270,28 @@ class ClassroomUI:
         
         # Add initial welcome message
         self.add_message("Assistant", "Welcome to your AI-powered learning session!\nAsk me anything, and I'll provide detailed explanations to help you learn.", 'assistant')
-        self.speak("Welcome to your AI-powered learning session! Ask me anything.")
+        self.speak_phrase(WELCOME)
 
-    def speak(self, text: str):
-        def speak_thread():
-            try:
-                self.engine.say(text)
-                self.engine.runAndWait()
-            except Exception as e:
-                logging.error(f"Text-to-speech failed: {e}")
-        
-        threading.Thread(target=speak_thread, daemon=True).start()
+    def speak(self, text: str, priority: int = PRIORITY_ANSWER, preempt: bool = False, cache: bool = False):
+        self.tts.say(text, priority, preempt, cache=cache)
+
+    def speak_phrase(self, phrase: str, priority: int = PRIORITY_PROMPT, preempt: bool = False):
+        self.tts.say(phrase, priority, preempt, cache=True, whole=True)
+
+    def _create_phrase_cache(self):
+        try:
+            speech_config = self.assistant.config.get("speech", {})
+            return PhraseCache(max_disk_bytes=int(speech_config.get("tts_cache_mb", 64) * 1024 * 1024))
+        except OSError as e:
+            logging.warning(f"Phrase audio cache disabled: {e}")
+            return None
 
     def toggle_voice(self):
         if self.voice_active:
             self.voice_active = False
             self.voice_btn.config(text="🎤 Voice")
             self.assistant.interrupt()
+            self.tts.interrupt()
             self.add_message("System", "Voice input canceled", 'system')
             return
             
@@ -234,7 +302,7 @@ class ClassroomUI:
         self.voice_active = True
         self.voice_btn.config(text="🔴 Listening...")
         self.add_message("System", "Listening... Please speak clearly into your microphone", 'system')
-        self.speak("I'm listening. Please ask your question.")
+        self.speak_phrase(LISTENING, preempt=True)
         
         def callback(transcript):
             self.voice_active = False
@@ -243,14 +311,23 @@ class ClassroomUI:
             if transcript:
                 self.input_entry.delete(0, tk.END)
                 self.input_entry.insert(0, transcript)
-                self.send_message()
+                self.send_message(priority="voice")
             else:
                 self.add_message("System", "Couldn't detect speech. Please try speaking louder and clearer.", 'system')
-                self.speak("I couldn't hear you. Please try speaking louder.")
+                self.speak_phrase(NOT_HEARD, preempt=True)
         
-        threading.Thread(target=lambda: self.assistant.start_voice_input(callback), daemon=True).start()
+        def on_partial(text):
+            self.root.after(0, lambda: self._show_partial_transcript(text))
+
+        # Recognition runs on a background thread; results are handed back to the Tk thread
+        self.assistant.start_voice_input(lambda transcript: self.root.after(0, lambda: callback(transcript)), on_partial)
+
+    def _show_partial_transcript(self, text: str):
+        if self.voice_active:
+            self.input_entry.delete(0, tk.END)
+            self.input_entry.insert(0, text)
 
-    def send_message(self):
+    def send_message(self, priority: str = "typed"):
         if self.processing:
             messagebox.showwarning("Processing", "Please wait for current response to complete")
             return
@@ -267,28 +344,41 @@ class ClassroomUI:
         self.voice_btn.config(state='disabled')
         self.send_btn.config(state='disabled')
         
-        self.root.after(100, lambda: self.process_query(query))
+        self.root.after(100, lambda: self.process_query(query, priority))
 
-    def process_query(self, query: str):
+    def process_query(self, query: str, priority: str = "typed"):
+        # Generation runs off the Tk thread so the webcam loop keeps going (at the governor's rate)
+        def worker():
+            try:
+                response = self.assistant.process_query(query, priority=priority)
+            except Exception as e:
+                logging.error(f"Error processing query: {e}")
+                response = None
+            self.root.after(0, lambda: self._handle_response(response))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _handle_response(self, response):
         try:
-            response = self.assistant.process_query(query)
-            
-            if response.get('success', False):
+            if response is None:
+                self.add_message("System", "Sorry, I encountered an error. Please try again.", 'error')
+                self.speak_phrase(TECHNICAL_DIFFICULTIES, preempt=True)
+            elif response.get('success', False):
                 self.add_message("Assistant", response['text'], 'assistant')
-                self.speak(response['text'])
+                self.speak(response['text'], preempt=True, cache=response.get('cached', False))
                 
                 if response.get('engagement') == "Struggling":
                     tips = "Learning Tips:\n- " + "\n- ".join(response.get('tips', []))
                     self.add_message("Assistant", tips, 'system')
-                    self.speak("Here are some learning tips to help you understand better.")
+                    self.speak_phrase(LEARNING_TIPS, PRIORITY_TIP)
             else:
                 self.add_message("System", response['text'], 'error')
-                self.speak("I'm having trouble with that question. Could you try rephrasing it?")
+                self.speak_phrase(REPHRASE, preempt=True)
                 
         except Exception as e:
             logging.error(f"Error processing query: {e}")
             self.add_message("System", "Sorry, I encountered an error. Please try again.", 'error')
-            self.speak("I'm having technical difficulties. Please try again.")
+            self.speak_phrase(TECHNICAL_DIFFICULTIES, preempt=True)
         finally:
             self.processing = False
             self.input_entry.config(state='normal')
@@ -296,48 +386,129 @@ class ClassroomUI:
             self.send_btn.config(state='normal')
             self.input_entry.focus_set()
 
+    def _setup_transcript(self):
+        interface_config = self.assistant.config.get("interface", {})
+        self.max_visible_messages = interface_config.get("max_visible_messages", 200)
+        self.history_page_size = interface_config.get("history_page_size", 50)
+        self.transcript = TranscriptArchive()
+        # Messages [_visible_start, _visible_end) of the archive are in the widget;
+        # older ones are loaded back from the archive when the user scrolls to the top
+        self._visible_start = 0
+        self._visible_end = 0
+        self._history_floor = 0
+        self._loading_history = False
+
+        # Read-only without toggling the widget state on every insert; copying still works
+        self.chat_history.bind("<Key>", self._block_chat_edits)
+        for event in ("<<Paste>>", "<<Cut>>", "<<Clear>>", "<<PasteSelection>>"):
+            self.chat_history.bind(event, lambda e: "break")
+        self.chat_history.configure(yscrollcommand=self._on_chat_scroll)
+
+    def _block_chat_edits(self, event):
+        navigation = ("Up", "Down", "Left", "Right", "Prior", "Next", "Home", "End")
+        if event.keysym in navigation or (event.state & 0x4 and event.keysym.lower() in ("c", "a")):
+            return None
+        return "break"
+
     def add_message(self, sender: str, text: str, tag: str):
-        self.chat_history.config(state='normal')
+        index = self.transcript.append(sender, text, tag)
+        self.chat_history.mark_set(f"msg{index}", "end-1c")
+        self.chat_history.mark_gravity(f"msg{index}", tk.LEFT)
         self.chat_history.insert(tk.END, f"{sender}: {text}\n\n", tag)
-        self.chat_history.config(state='disabled')
+        self._visible_end = index + 1
+        while self._visible_end - self._visible_start > self.max_visible_messages:
+            self._drop_oldest_message()
         self.chat_history.see(tk.END)
 
+    def _drop_oldest_message(self):
+        first = self._visible_start
+        self.chat_history.delete(f"msg{first}", f"msg{first + 1}")
+        self.chat_history.mark_unset(f"msg{first}")
+        self._visible_start = first + 1
+
+    def _on_chat_scroll(self, first, last):
+        self.chat_history.vbar.set(first, last)
+        if float(first) <= 0.0 and self._visible_start > self._history_floor and not self._loading_history:
+            self._loading_history = True
+            self.root.after_idle(self._load_older_messages)
+
+    def _load_older_messages(self):
+        try:
+            old_first = self._visible_start
+            start = max(self._history_floor, old_first - self.history_page_size)
+            for index, message in reversed(list(enumerate(self.transcript.read(start, old_first), start))):
+                content = f"{message['sender']}: {message['text']}\n\n"
+                self.chat_history.insert("1.0", content, message['tag'])
+                self.chat_history.mark_set(f"msg{index + 1}", f"1.0 + {len(content)} chars")
+                self.chat_history.mark_set(f"msg{index}", "1.0")
+                self.chat_history.mark_gravity(f"msg{index}", tk.LEFT)
+                self._visible_start = index
+            if self._visible_start < old_first:
+                self.chat_history.yview(f"msg{old_first}")
+        except Exception as e:
+            logging.error(f"Could not load earlier messages: {e}")
+        finally:
+            self._loading_history = False
+
     def update_webcam(self):
-        if self.cap:
+        visible = self.webcam_label.winfo_viewable()
+        if self.cameras:
+            try:
+                status = self.cameras.poll()
+                self.assistant.engagement_detector.update_status(status['state'])
+                self._set_engagement_label(
+                    f"Room: {status['state']} {status['icon']} ({len(status['cameras'])} cameras)",
+                    status['color'])
+                frame = self.cameras.latest_frame()
+                if frame is not None:
+                    self._show_frame(frame, visible)
+            except Exception as e:
+                logging.error(f"Camera update error: {e}")
+        elif self.cap:
             try:
-                ret, frame = self.cap.read()
-                if ret:
-                    frame = cv2.resize(frame, (320, 240))
+                frame = self.cap.read()
+                if frame is not None:
                     result = self.assistant.engagement_detector.analyze_frame(frame)
-                    
-                    self.engagement_label.config(
-                        text=f"Status: {result['state']} {result['icon']}",
-                        foreground=result['color']
-                    )
-                    
-                    img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    img = Image.fromarray(img)
-                    self.webcam_label.imgtk = ImageTk.PhotoImage(image=img)
-                    self.webcam_label.config(image=self.webcam_label.imgtk)
+                    self._set_engagement_label(f"Status: {result['state']} {result['icon']}", result['color'])
+                    self._show_frame(frame, visible)
                     
             except Exception as e:
                 logging.error(f"Webcam update error: {e}")
         
-        self.root.after(100, self.update_webcam)
+        self.root.after(int(self.assistant.governor.frame_interval() * 1000), self.update_webcam)
+
+    def _set_engagement_label(self, text: str, color: str):
+        if (text, color) != self._engagement_label_state:
+            self._engagement_label_state = (text, color)
+            self.engagement_label.config(text=text, foreground=color)
+
+    def _show_frame(self, frame, visible: bool):
+        # Skip all rendering work while the window is minimized or hidden; analysis keeps running
+        if not visible:
+            self.display.skip()
+            return
+        self.display.render(frame)
 
     def clear_conversation(self):
         self.assistant.clear_conversation()
-        self.chat_history.config(state='normal')
         self.chat_history.delete(1.0, tk.END)
-        self.chat_history.config(state='disabled')
+        for index in range(self._visible_start, self._visible_end):
+            self.chat_history.mark_unset(f"msg{index}")
+        self._visible_start = self._visible_end = self._history_floor = len(self.transcript)
         self.add_message("Assistant", "Conversation history cleared. What would you like to learn about now?", 'assistant')
-        self.speak("Conversation history cleared. What would you like to learn about now?")
+        self.speak_phrase(CONVERSATION_CLEARED, preempt=True)
 
     def cleanup(self):
         try:
             if self.cap:
                 self.cap.release()
+            if self.cameras:
+                self.cameras.stop()
+            logging.info(f"Webcam display: {self.display.stats()}")
             cv2.destroyAllWindows()
-            self.engine.stop()
+            logging.info(f"Speech: {self.tts.stats()}")
+            self.tts.shutdown()
+            self.assistant.shutdown()
+            self.transcript.close()
         except Exception as e:
             logging.error(f"Cleanup error: {e}")
\ No newline at end of file
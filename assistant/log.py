@@ -0,0 +1,147 @@
+"""Application logging: callers enqueue, a background thread writes.
+
+configure_logging() puts one DroppingQueueHandler on the root logger, in front of a bounded
+queue. A QueueListener thread drains it into a size-rotated JSON Lines file and, optionally,
+a plain-text console. Logging never blocks on disk: when the queue is full the record is
+dropped and counted, and shutdown_logging() reports the count at exit. Records with a large
+`payload` (prompts, raw model output) are sampled and truncated by PayloadFilter before they
+are queued.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from typing import Optional
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, thread and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class PayloadFilter(logging.Filter):
+    """Samples and truncates records carrying a large `payload` (prompts, raw model output).
+
+    Runs before a record is queued, so dropped payloads cost nothing downstream.
+    """
+
+    def __init__(self, sample_rate: float = 0.1, max_chars: int = 2000):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_chars = max_chars
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        payload = getattr(record, 'payload', None)
+        if payload is None:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        payload = str(payload)
+        if len(payload) > self.max_chars:
+            record.payload = payload[:self.max_chars]
+            record.payload_truncated = len(payload)
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the writer falls behind, records are dropped and counted."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class folds the traceback into msg; keep it in exc_text so the JSON file
+        # gets it as its own field (tracebacks cannot be pickled or passed on, so format it now)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(log_dir: str = "logs", console: bool = True, level: int = logging.INFO,
+                      max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                      payload_sample_rate: float = 0.1, max_payload_chars: int = 2000,
+                      queue_size: int = 10000) -> logging.handlers.QueueListener:
+    """Route all logging through a bounded queue to a background writer.
+
+    The file gets JSON lines with size-based rotation; the console keeps the plain format.
+    """
+    global _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, f"assistant_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+        handlers.append(console_handler)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(PayloadFilter(payload_sample_rate, max_payload_chars))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush everything still queued; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        if DroppingQueueHandler.dropped:
+            print(f"WARNING: {DroppingQueueHandler.dropped} log records were dropped", file=sys.stderr)
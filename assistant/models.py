@@ -1,114 +1,456 @@
 # models.py — FINAL update using `declare-lab/flan-alpaca-base` for educational Q&A
 
-import torch
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, GenerationConfig
+import gc
 import logging
+import os
 import re
 import threading
-from typing import Optional
-import speech_recognition as sr
+from typing import Any, Callable, Dict, Optional, Tuple
 import time
 
+# torch, transformers and the audio stack are imported where they are first needed, so
+# importing this module (e.g. for the headless CLI or tooling) stays cheap.
+
+
+class CancelCriteria:
+    """Stopping criterion that ends generation as soon as the given event is set.
+
+    StoppingCriteriaList only needs a callable, so this does not subclass
+    transformers.StoppingCriteria and the module can be imported without transformers.
+    """
+
+    def __init__(self, cancel_event: threading.Event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.cancel_event.is_set()
+
+
+class DegenerationCriteria:
+    """Stopping criterion that ends a generation which is already not worth finishing.
+
+    Flags an answer that starts by copying the prompt (the system prompt or the question),
+    one stuck repeating the same n-gram, and one whose first tokens contain no words. The
+    cause is kept in `reason`.
+    """
+
+    def __init__(self, tokenizer, prompt_ids, ngram_size: int = 6, max_repeats: int = 3,
+                 echo_tokens: int = 8, junk_tokens: int = 6):
+        self.tokenizer = tokenizer
+        self.echo_tokens = echo_tokens
+        self._prompt_windows = {tuple(prompt_ids[i:i + echo_tokens])
+                                for i in range(len(prompt_ids) - echo_tokens + 1)}
+        self.ngram_size = ngram_size
+        self.max_repeats = max_repeats
+        self.junk_tokens = junk_tokens
+        self.reason: Optional[str] = None
+        self._start = None
+        self._seen = 0
+        self._ngrams: Dict[tuple, int] = {}
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        ids = input_ids[0].tolist()
+        if self._start is None:
+            # First call comes after the first new token; anything before it is the prompt
+            self._start = len(ids) - 1
+        generated = ids[self._start:]
+        count = len(generated)
+
+        if count == self.echo_tokens and tuple(generated) in self._prompt_windows:
+            self.reason = "echo"
+        elif count == self.junk_tokens and not re.search(
+                r'[^\W\d_]{2}', self.tokenizer.decode(generated, skip_special_tokens=True)):
+            self.reason = "junk"
+        else:
+            n = self.ngram_size
+            for end in range(max(self._seen, n), count + 1):
+                ngram = tuple(generated[end - n:end])
+                self._ngrams[ngram] = self._ngrams.get(ngram, 0) + 1
+                if self._ngrams[ngram] >= self.max_repeats:
+                    self.reason = "loop"
+            self._seen = count + 1
+        return self.reason is not None
+
+
+DEFAULT_MODEL = "declare-lab/flan-alpaca-base"
+
+DEFAULT_GENERATION_SETTINGS = {
+    'max_new_tokens': 300,
+    'temperature': 0.7,
+    'top_p': 0.9,
+    'repetition_penalty': 1.1,
+    'do_sample': True,
+    'num_beams': 1,
+    'early_stopping': True
+}
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if it cannot be measured.
+
+    Never falls back to getrusage: ru_maxrss is the lifetime peak, which cannot show memory
+    being released.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class _PeakMemory:
+    """Samples process memory on a background thread while a swap runs."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.baseline = rss_bytes()
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="swap-memory", daemon=True)
+
+    def start(self):
+        if self.baseline is not None:
+            self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes() or 0)
+
+    def stop(self) -> Dict[str, Any]:
+        if self.baseline is None:
+            return {'rss': 'unavailable (install psutil)'}
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes() or 0)
+        return {
+            'rss_before_mb': round(self.baseline / 2**20, 1),
+            'peak_rss_mb': round(self.peak / 2**20, 1),
+            'rss_after_mb': round((rss_bytes() or 0) / 2**20, 1)
+        }
+
+
+class LoadedModel:
+    """A tokenizer, model and generation config that are only ever swapped together.
+
+    `users` counts generations running on it, so retired weights are freed only after the
+    last in-flight query on them finishes.
+    """
+
+    def __init__(self, name: str, tokenizer, model, generation_config):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.model = model
+        self.generation_config = generation_config
+        self.users = 0
+        self.retired = False
+
+
 class AIModels:
-    def __init__(self):
+    def __init__(self, asr_backend: str = "google", asr_options: Optional[Dict[str, Any]] = None,
+                 model_name: str = DEFAULT_MODEL, model_options: Optional[Dict[str, Any]] = None):
+        import torch
+
         self.logger = logging.getLogger(__name__)
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self._stop_event = threading.Event()
         self._listening = False
-        self.tokenizer = None
-        self.model = None
-        self._initialize_models()
+        self._microphone = None
+        self.asr_backend = asr_backend
+        self.asr_options = asr_options or {}
+        self.asr = None
+        self.last_asr_stats = {}
+        self.governor = None
+        self._active: Optional[LoadedModel] = None
+        self._model_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self.last_swap: Dict[str, Any] = {}
+        self.model_options = model_options or {}
+        self._initialize_models(model_name)
         self.conversation_history = []
         self.max_history = 3
+        self.degenerate_counts: Dict[str, int] = {}
 
         self.system_prompt = (
             "You are a knowledgeable and friendly teaching assistant."
             " Provide accurate, student-friendly explanations with examples in simple language."
         )
 
-        self.generation_config = GenerationConfig(
-            max_new_tokens=300,
-            temperature=0.7,
-            top_p=0.9,
-            repetition_penalty=1.1,
-            do_sample=True,
-            num_beams=1,
-            early_stopping=True
-        )
-
-    def _initialize_models(self):
+    def _initialize_models(self, model_name: str):
         try:
-            model_name = "declare-lab/flan-alpaca-base"
-            self.logger.info(f"Loading model: {model_name}")
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
+            self._active = self._load(model_name, DEFAULT_GENERATION_SETTINGS)
         except Exception as e:
             self.logger.error(f"Model initialization failed: {e}")
             raise RuntimeError("Failed to load model")
 
-    def generate_educational_response(self, prompt: str) -> str:
-        if not self.model or not self.tokenizer:
+    def _load(self, model_name: str, generation_settings: Dict[str, Any]) -> LoadedModel:
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, GenerationConfig
+
+        # Weights live in a cache shared by installs and builds instead of inside the bundle;
+        # safetensors checkpoints there are memory-mapped rather than read into memory
+        options = {
+            'cache_dir': os.environ.get("CLASSROOM_MODEL_CACHE") or self.model_options.get("cache_dir"),
+            'local_files_only': self.model_options.get("offline", False)
+        }
+        self.logger.info(f"Loading model: {model_name} (cache: {options['cache_dir'] or 'default'})")
+        tokenizer = AutoTokenizer.from_pretrained(model_name, **options)
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_name, low_cpu_mem_usage=self.model_options.get("low_cpu_mem_usage", True), **options)
+        model = model.to(self.device)
+        model.eval()
+        return LoadedModel(model_name, tokenizer, model, GenerationConfig(**generation_settings))
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return self._active.name if self._active else None
+
+    @property
+    def model(self):
+        return self._active.model if self._active else None
+
+    @property
+    def tokenizer(self):
+        return self._active.tokenizer if self._active else None
+
+    @property
+    def generation_config(self):
+        return self._active.generation_config if self._active else None
+
+    def _acquire(self) -> Optional[LoadedModel]:
+        with self._model_lock:
+            active = self._active
+            if active is not None:
+                active.users += 1
+            return active
+
+    def _release(self, loaded: LoadedModel):
+        with self._model_lock:
+            loaded.users -= 1
+            free = loaded.retired and loaded.users == 0
+        if free:
+            self._free(loaded)
+
+    def _free(self, loaded: LoadedModel):
+        loaded.model = None
+        loaded.tokenizer = None
+        gc.collect()
+        if self.device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+        self.logger.info(f"Released weights of {loaded.name}")
+
+    def swap_model(self, model_name: Optional[str] = None, generation_settings: Optional[Dict[str, Any]] = None,
+                   on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> threading.Thread:
+        """Switch to another model and/or generation settings without stopping the app.
+
+        The new pair is loaded and warmed up on a background thread while queries keep using
+        the current one, then replaces it between requests. Queries already running finish on
+        the old model, whose weights are released afterwards. `on_done` receives the swap
+        report (also kept in `last_swap`).
+        """
+        thread = threading.Thread(target=self._swap, args=(model_name, generation_settings, on_done),
+                                  name="model-swap", daemon=True)
+        thread.start()
+        return thread
+
+    def _swap(self, model_name: Optional[str], generation_settings: Optional[Dict[str, Any]],
+              on_done: Optional[Callable[[Dict[str, Any]], None]]):
+        with self._swap_lock:
+            current = self._active
+            settings = dict(DEFAULT_GENERATION_SETTINGS)
+            if current is not None:
+                settings.update({key: value for key, value in current.generation_config.to_diff_dict().items()
+                                 if key != 'transformers_version'})
+            settings.update(generation_settings or {})
+            model_name = model_name or self.model_name
+            report = {'model': model_name, 'previous_model': self.model_name, 'success': False}
+
+            peak = _PeakMemory()
+            peak.start()
+            start = time.perf_counter()
+            try:
+                if current is not None and model_name == current.name:
+                    from transformers import GenerationConfig
+                    # Settings only: share the loaded weights
+                    loaded = LoadedModel(model_name, current.tokenizer, current.model,
+                                         GenerationConfig(**settings))
+                else:
+                    loaded = self._load(model_name, settings)
+                report['load_seconds'] = time.perf_counter() - start
+
+                if current is None or loaded.model is not current.model:
+                    warmup_start = time.perf_counter()
+                    self._warmup(loaded)
+                    report['warmup_seconds'] = time.perf_counter() - warmup_start
+
+                switch_start = time.perf_counter()
+                with self._model_lock:
+                    previous, self._active = self._active, loaded
+                    free_previous = False
+                    if previous is not None and previous.model is not loaded.model:
+                        previous.retired = True
+                        free_previous = previous.users == 0
+                    report['in_flight_on_previous'] = previous.users if previous else 0
+                report['switch_ms'] = (time.perf_counter() - switch_start) * 1000
+                if free_previous:
+                    self._free(previous)
+                report['success'] = True
+            except Exception as e:
+                self.logger.error(f"Model swap to {model_name} failed, keeping {self.model_name}: {e}")
+                report['error'] = str(e)
+            finally:
+                report['total_seconds'] = time.perf_counter() - start
+                report.update(peak.stop())
+
+            self.last_swap = report
+            self.logger.info(f"Model swap: {report}")
+        if on_done:
+            on_done(report)
+
+    def _warmup(self, loaded: LoadedModel):
+        import torch
+
+        inputs = loaded.tokenizer("Question: What is a noun?", return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            loaded.model.generate(**inputs, max_new_tokens=8)
+
+    def generate_educational_response(self, prompt: str, cancel_event: Optional[threading.Event] = None,
+                                      record_history: bool = True) -> Optional[str]:
+        """Answer a question. Returns None if cancel_event was set before the answer completed."""
+        loaded = self._acquire()
+        if loaded is None:
             return "System not properly initialized."
+        try:
+            return self._generate(loaded, prompt, cancel_event, record_history)
+        finally:
+            self._release(loaded)
 
+    def _generate(self, loaded: LoadedModel, prompt: str, cancel_event: Optional[threading.Event],
+                  record_history: bool) -> Optional[str]:
         try:
             full_prompt = f"{self.system_prompt}\nQuestion: {prompt}"
-            self.logger.info(f"Prompt sent to model: {full_prompt}")
-
-            inputs = self.tokenizer(full_prompt, return_tensors="pt", truncation=True, max_length=512).to(self.device)
-            outputs = self.model.generate(
-                **inputs,
-                generation_config=self.generation_config
-            )
+            self.logger.info("Prompt sent to model", extra={'payload': full_prompt})
 
-            decoded = self.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
-            cleaned = re.sub(r'\s+', ' ', decoded)
+            inputs = loaded.tokenizer(full_prompt, return_tensors="pt", truncation=True, max_length=512).to(self.device)
+            cleaned, reason = self._decode(loaded, inputs, prompt, cancel_event, loaded.generation_config)
+            if reason is not None and self.model_options.get("retry_degenerate", True):
+                # Sampling went astray; greedy decoding that cannot repeat itself usually does not
+                from transformers import GenerationConfig
 
-            self.logger.info(f"Raw model output: {repr(decoded)}")
-
-            if cleaned.lower() in ["", "explain", prompt.lower().strip()] or len(cleaned.split()) < 3:
+                settings = {key: value for key, value in loaded.generation_config.to_diff_dict().items()
+                            if key not in ('transformers_version', 'temperature', 'top_p')}
+                greedy = GenerationConfig(**dict(settings, do_sample=False, num_beams=1, no_repeat_ngram_size=3))
+                self.logger.info(f"Degenerate answer ({reason}), retrying with greedy decoding")
+                cleaned, reason = self._decode(loaded, inputs, prompt, cancel_event, greedy)
+            if cleaned is None:
+                return None
+            if reason is not None:
                 return self._get_fallback_response(prompt)
 
-            self.conversation_history.append(f"Student: {prompt}")
-            self.conversation_history.append(f"Assistant: {cleaned}")
+            if record_history:
+                self.record_exchange(prompt, cleaned)
             return cleaned if cleaned.endswith(('.', '!', '?')) else cleaned + '.'
 
         except Exception as e:
             self.logger.error(f"Response generation error: {e}")
             return self._get_fallback_response(prompt)
 
+    def _decode(self, loaded: LoadedModel, inputs, prompt: str, cancel_event: Optional[threading.Event],
+                generation_config) -> Tuple[Optional[str], Optional[str]]:
+        """One generation: (cleaned text, None), (text, degeneration reason) or (None, None) if cancelled."""
+        from transformers import StoppingCriteriaList
+
+        stopping_criteria = StoppingCriteriaList([CancelCriteria(cancel_event)] if cancel_event else [])
+        degeneration = None
+        if self.model_options.get("stop_degenerate", True):
+            degeneration = DegenerationCriteria(loaded.tokenizer, inputs['input_ids'][0].tolist())
+            stopping_criteria.append(degeneration)
+        decode_start = time.perf_counter()
+        outputs = loaded.model.generate(
+            **inputs,
+            generation_config=generation_config,
+            stopping_criteria=stopping_criteria
+        )
+        if cancel_event and cancel_event.is_set():
+            return None, None
+        if self.governor:
+            self.governor.record_decode(outputs.shape[-1], time.perf_counter() - decode_start)
+
+        decoded = loaded.tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
+        cleaned = re.sub(r'\s+', ' ', decoded)
+        self.logger.info("Raw model output", extra={'payload': decoded})
+
+        reason = degeneration.reason if degeneration else None
+        if reason is None and (cleaned.lower() in ["", "explain", prompt.lower().strip()]
+                               or len(cleaned.split()) < 3):
+            reason = "short"
+        if reason is not None:
+            self.degenerate_counts[reason] = self.degenerate_counts.get(reason, 0) + 1
+            if degeneration and degeneration.reason:
+                self.logger.info(f"Stopped degenerate generation after {outputs.shape[-1]} tokens: {reason}")
+        return cleaned, reason
+
+    def record_exchange(self, prompt: str, answer: str):
+        self.conversation_history.append(f"Student: {prompt}")
+        self.conversation_history.append(f"Assistant: {answer}")
+
     def _get_fallback_response(self, prompt: str = "") -> str:
         if prompt:
             return f"I'm thinking about your question: '{prompt.strip()}'. Could you rephrase it?"
         return "I'm still learning. Could you ask in a different way?"
 
-    def voice_input(self) -> Optional[str]:
-        if self._stop_event.is_set() or self._listening:
+    def voice_input(self, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        if self._listening:
             return None
 
         self._listening = True
         self._stop_event.clear()
         try:
-            recognizer = sr.Recognizer()
-            with sr.Microphone() as source:
-                recognizer.adjust_for_ambient_noise(source, duration=1)
-                self.logger.info("Listening...")
-                for _ in range(3):
-                    if self._stop_event.is_set():
-                        return None
-                    try:
-                        audio = recognizer.listen(source, timeout=5, phrase_time_limit=8)
-                        text = recognizer.recognize_google(audio)
-                        if text and len(text.strip()) > 3:
-                            return text.strip()
-                    except Exception:
-                        continue
-                return None
+            if self._microphone is None:
+                from .asr import create_asr_backend
+                from .audio import MicrophoneStream
+
+                self.asr = create_asr_backend(self.asr_backend, **self.asr_options)
+                microphone = MicrophoneStream()
+                microphone.start()
+                # Only kept once it started, so a failed start is retried on the next call
+                self._microphone = microphone
+            self.logger.info("Listening...")
+            for _ in range(3):
+                stream = self.asr.start_stream(self._microphone.sample_rate)
+
+                def on_frame(frame: bytes):
+                    partial = stream.accept(frame)
+                    if partial and on_partial:
+                        on_partial(partial)
+
+                audio = self._microphone.listen(timeout=5, max_seconds=8, stop_event=self._stop_event,
+                                                on_frame=on_frame)
+                if self._stop_event.is_set():
+                    return None
+                if audio is None:
+                    continue
+                text = stream.finish()
+                self.last_asr_stats = stream.stats()
+                self.logger.info(f"Speech recognized ({self.asr.name}): {self.last_asr_stats}")
+                if text and len(text.strip()) > 3:
+                    return text.strip()
+            return None
         except Exception as e:
             self.logger.error(f"Voice input error: {e}")
             return None
         finally:
             self._listening = False
 
+    def close_audio(self):
+        if self._microphone is not None:
+            self._microphone.close()
+            self._microphone = None
+
     def interrupt(self):
         self._stop_event.set()
         self.logger.info("Interrupted")
@@ -0,0 +1,211 @@
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import Counter
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .capture import CameraCapture, VideoSource, parse_source
+
+# Most severe first; used to break ties when cameras disagree
+STATE_SEVERITY = ['Struggling', 'Confused', 'Thinking', 'Engaged', 'Neutral']
+
+
+class FrameSlot:
+    """One frame of fixed shape in shared memory, guarded by a lock and a sequence number."""
+
+    def __init__(self, ctx, shape: Tuple[int, int, int]):
+        self.shape = shape
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self.lock = ctx.Lock()
+        self.seq = ctx.Value('L', 0, lock=False)
+        self.ready = ctx.Event()
+
+    def handle(self) -> Dict[str, Any]:
+        return {'name': self.shm.name, 'shape': self.shape, 'lock': self.lock, 'seq': self.seq, 'ready': self.ready}
+
+    def write(self, frame: np.ndarray):
+        view = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        with self.lock:
+            view[:] = frame
+            self.seq.value += 1
+        self.ready.set()
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _analyzer_worker(index: int, slot: Dict[str, Any], detector_kwargs: Dict[str, Any], results, stop_event):
+    # Runs in a child process: attach to the shared frame, analyze every new frame, report small dicts back
+    from assistant.engagement import EngagementDetector
+
+    shm = shared_memory.SharedMemory(name=slot['name'])
+    try:
+        shared = np.ndarray(slot['shape'], dtype=np.uint8, buffer=shm.buf)
+        frame = np.empty(slot['shape'], dtype=np.uint8)
+        detector = EngagementDetector(log_dir=None, **detector_kwargs)
+        last_seq = 0
+        while not stop_event.is_set():
+            if not slot['ready'].wait(timeout=0.5):
+                continue
+            slot['ready'].clear()
+            with slot['lock']:
+                seq = slot['seq'].value
+                if seq == last_seq:
+                    continue
+                frame[:] = shared
+            last_seq = seq
+
+            start = time.perf_counter()
+            result = detector.analyze_frame(frame)
+            results.put({
+                'source': index,
+                'seq': seq,
+                'state': result['state'],
+                'faces': len(detector.last_faces),
+                'latency': time.perf_counter() - start,
+                'timestamp': time.time()
+            })
+        del shared
+    finally:
+        shm.close()
+
+
+class RoomEngagement:
+    def __init__(self, emotion_map: Dict[int, Dict[str, str]], stale_after: float = 2.0):
+        self.by_state = {entry['state']: entry for entry in emotion_map.values()}
+        self.stale_after = stale_after
+        self.sources = {}
+
+    def update(self, result: Dict[str, Any]):
+        self.sources[result['source']] = result
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        fresh = [r for r in self.sources.values() if now - r['timestamp'] <= self.stale_after]
+        watching = [r['state'] for r in fresh if r['faces']]
+        if watching:
+            counts = Counter(watching)
+            top = max(counts.values())
+            state = next(s for s in STATE_SEVERITY if counts.get(s) == top)
+        else:
+            state = 'Neutral'
+
+        status = dict(self.by_state[state])
+        status['cameras'] = {r['source']: r['state'] for r in fresh}
+        status['faces'] = sum(r['faces'] for r in fresh)
+        return status
+
+
+class MultiCameraManager:
+    def __init__(self, sources: List[Any], emotion_map: Dict[int, Dict[str, str]],
+                 frame_size: Tuple[int, int] = (320, 240), detector_kwargs: Optional[Dict[str, Any]] = None,
+                 governor=None, capture_options: Optional[Dict[str, Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.sources = [parse_source(s) for s in sources]
+        self.frame_size = frame_size
+        self.detector_kwargs = detector_kwargs or {}
+        self.governor = governor
+        self.capture_options = capture_options or {}
+        self.room = RoomEngagement(emotion_map)
+        self._ctx = mp.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._results = self._ctx.Queue()
+        self._slots = []
+        self._workers = []
+        self._readers = []
+        self._latest = {}
+        self._running = threading.Event()
+
+    def start(self):
+        width, height = self.frame_size
+        for index, source in enumerate(self.sources):
+            cap = CameraCapture(source, size=self.frame_size, fourcc=self.capture_options.get("fourcc", "MJPG"),
+                                fps=self.capture_options.get("fps"),
+                                buffer_size=self.capture_options.get("buffer_size", 1))
+            if not cap.open():
+                self.logger.warning(f"Could not open video source {source!r}")
+                continue
+
+            slot = FrameSlot(self._ctx, (height, width, 3))
+            worker = self._ctx.Process(
+                target=_analyzer_worker,
+                args=(index, slot.handle(), self.detector_kwargs, self._results, self._stop),
+                name=f"engagement-analyzer-{index}",
+                daemon=True)
+            worker.start()
+            reader = threading.Thread(target=self._read_source, args=(index, source, cap, slot),
+                                      name=f"camera-reader-{index}", daemon=True)
+            self._slots.append(slot)
+            self._workers.append(worker)
+            self._readers.append(reader)
+
+        self._running.set()
+        for reader in self._readers:
+            reader.start()
+        self.logger.info(f"Started {len(self._workers)} of {len(self.sources)} video sources")
+        return len(self._workers) > 0
+
+    def _read_source(self, index: int, source: VideoSource, cap: CameraCapture, slot: FrameSlot):
+        # Files are paced at their native rate and looped so they can stand in for live cameras
+        is_file = isinstance(source, str) and '://' not in source
+        interval = 1.0 / (cap.format.get('fps') or 30.0) if is_file else 0.0
+        last_publish = 0.0
+        try:
+            while self._running.is_set():
+                # Every frame is grabbed to keep the stream current, but only those the analyzers
+                # (and the display, polled at the same rate) will see are decoded
+                if not cap.grab():
+                    if is_file:
+                        cap.rewind()
+                        continue
+                    time.sleep(0.1)
+                    continue
+                now = time.monotonic()
+                if not self.governor or now - last_publish >= self.governor.frame_interval():
+                    frame = cap.retrieve()
+                    if frame is not None:
+                        self._latest[index] = frame.copy()
+                        slot.write(frame)
+                        last_publish = now
+                if interval:
+                    time.sleep(interval)
+        except Exception as e:
+            self.logger.error(f"Video source {source!r} failed: {e}")
+        finally:
+            cap.release()
+
+    def poll(self) -> Dict[str, Any]:
+        """Drain analyzer results and return the merged room-level status."""
+        while True:
+            try:
+                self.room.update(self._results.get_nowait())
+            except queue.Empty:
+                break
+        return self.room.status()
+
+    def latest_frame(self, index: Optional[int] = None) -> Optional[np.ndarray]:
+        if index is None:
+            return next(iter(self._latest.values()), None)
+        return self._latest.get(index)
+
+    def stop(self):
+        self._running.clear()
+        self._stop.set()
+        for reader in self._readers:
+            reader.join(timeout=2)
+        for worker in self._workers:
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+        for slot in self._slots:
+            slot.close()
+        self._readers, self._workers, self._slots = [], [], []
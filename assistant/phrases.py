@@ -0,0 +1,20 @@
+# Fixed prompts spoken by the UI. They are pre-rendered into the phrase audio cache
+# (at startup, or ahead of time with `python -m tools.render_phrases`) so they play instantly.
+
+WELCOME = "Welcome to your AI-powered learning session! Ask me anything."
+LISTENING = "I'm listening. Please ask your question."
+NOT_HEARD = "I couldn't hear you. Please try speaking louder."
+LEARNING_TIPS = "Here are some learning tips to help you understand better."
+REPHRASE = "I'm having trouble with that question. Could you try rephrasing it?"
+TECHNICAL_DIFFICULTIES = "I'm having technical difficulties. Please try again."
+CONVERSATION_CLEARED = "Conversation history cleared. What would you like to learn about now?"
+
+FIXED_PHRASES = [
+    WELCOME,
+    LISTENING,
+    NOT_HEARD,
+    LEARNING_TIPS,
+    REPHRASE,
+    TECHNICAL_DIFFICULTIES,
+    CONVERSATION_CLEARED
+]
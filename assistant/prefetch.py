@@ -0,0 +1,197 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .cache import ResponseCache
+from .text import normalize_query
+
+_QUESTION_PREFIX = re.compile(
+    r"^(what is|what are|what's|whats|who is|who was|define|describe|explain|tell me about|"
+    r"how does|how do|why is|why are|what does)\s+(an?\s+|the\s+)?", re.IGNORECASE)
+
+FOLLOWUP_TEMPLATES = (
+    "Give an example of {topic}",
+    "Why is {topic} important?",
+    "Explain {topic} in simpler terms",
+)
+
+
+def extract_topic(query: str) -> Optional[str]:
+    topic = _QUESTION_PREFIX.sub("", query.strip().rstrip("?.! ")).strip()
+    return topic if topic and len(topic.split()) <= 6 else None
+
+
+def template_followups(query: str, answer: str) -> List[str]:
+    """Follow-ups students commonly ask about the topic of a "what is X" style question."""
+    topic = extract_topic(query)
+    return [template.format(topic=topic) for template in FOLLOWUP_TEMPLATES] if topic else []
+
+
+def history_followups(query: str, history: Iterable[Tuple[Optional[str], str]]) -> List[str]:
+    """Questions that came next, in the same session, after earlier asks of this question.
+
+    `history` is (session_id, query) pairs in chronological order; the most frequent
+    follow-ups come first.
+    """
+    key = normalize_query(query)
+    counts: Dict[str, int] = {}
+    previous = {}
+    for session_id, text in history:
+        if previous.get(session_id) == key and normalize_query(text) != key:
+            counts[text] = counts.get(text, 0) + 1
+        previous[session_id] = normalize_query(text)
+    return sorted(counts, key=counts.get, reverse=True)
+
+
+class FollowUpPrefetcher:
+    """Answers likely follow-up questions while the assistant is idle.
+
+    After each answer, `predictors` (callables taking the query and answer) propose
+    follow-ups. A background thread generates them once no query has been active for
+    `idle_delay` seconds and stores the answers in the response cache. Real queries call
+    pause(), which cancels the prefetch in progress, and resume() when they finish. After
+    each generation the thread rests long enough that prefetching uses at most
+    `cpu_budget` of wall time.
+    """
+
+    def __init__(self, generate: Callable[[str, threading.Event], Optional[str]], cache: ResponseCache,
+                 key: Callable[[str], Hashable], predictors: List[Callable[[str, str], List[str]]],
+                 cpu_budget: float = 0.25, idle_delay: float = 2.0, max_followups: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.generate = generate
+        self.cache = cache
+        self.key = key
+        self.predictors = predictors
+        self.cpu_budget = min(max(cpu_budget, 0.01), 1.0)
+        self.idle_delay = idle_delay
+        self.max_followups = max_followups
+        self._candidates = deque()
+        self._exchange: Optional[Tuple[str, str]] = None
+        self._condition = threading.Condition()
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._not_before = 0.0
+        self._current: Optional[threading.Event] = None
+        self._closed = False
+        self.generated = 0
+        self.cancelled = 0
+        self.busy_seconds = 0.0
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="followup-prefetch", daemon=True)
+        self._thread.start()
+
+    def schedule(self, query: str, answer: str):
+        """Replace pending candidates with follow-ups to this exchange.
+
+        Prediction itself runs on the prefetch thread, off the query path.
+        """
+        with self._condition:
+            self._candidates.clear()
+            self._exchange = (query, answer)
+            self._condition.notify()
+
+    def _predict(self, query: str, answer: str) -> List[str]:
+        candidates = []
+        for predictor in self.predictors:
+            try:
+                candidates.extend(predictor(query, answer))
+            except Exception as e:
+                self.logger.warning(f"Follow-up prediction failed: {e}")
+        seen, fresh = {normalize_query(query)}, []
+        for candidate in candidates:
+            normalized = normalize_query(candidate)
+            if normalized and normalized not in seen and self.key(candidate) not in self.cache:
+                seen.add(normalized)
+                fresh.append(candidate)
+        return fresh[:self.max_followups]
+
+    def pause(self):
+        """A real query is starting: stop prefetching now."""
+        with self._condition:
+            self._active += 1
+            if self._current is not None:
+                self._current.set()
+
+    def resume(self):
+        with self._condition:
+            self._active -= 1
+            self._last_activity = time.monotonic()
+            self._condition.notify()
+
+    def _next_task(self) -> Optional[Tuple[str, object]]:
+        """Wait for work: ('predict', exchange) as soon as one arrives, ('generate', text) when idle."""
+        with self._condition:
+            while not self._closed:
+                if self._exchange is not None:
+                    exchange, self._exchange = self._exchange, None
+                    return 'predict', exchange
+                now = time.monotonic()
+                ready_at = max(self._last_activity + self.idle_delay, self._not_before)
+                if self._candidates and not self._active and now >= ready_at:
+                    self._current = threading.Event()
+                    return 'generate', self._candidates.popleft()
+                self._condition.wait(max(ready_at - now, 0.05) if self._candidates else None)
+            return None
+
+    def _run(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            kind, item = task
+            if kind == 'predict':
+                candidates = self._predict(*item)
+                with self._condition:
+                    if self._exchange is None:
+                        self._candidates.extend(candidates)
+                continue
+            self._prefetch(item)
+
+    def _prefetch(self, text: str):
+        cancel_event = self._current
+        start = time.monotonic()
+        answer = None
+        try:
+            answer = self.generate(text, cancel_event)
+        except Exception as e:
+            self.logger.warning(f"Prefetch of {text!r} failed: {e}")
+        elapsed = time.monotonic() - start
+
+        with self._condition:
+            self._current = None
+            self.busy_seconds += elapsed
+            # Rest so that generating takes at most cpu_budget of the time
+            self._not_before = time.monotonic() + elapsed * (1 / self.cpu_budget - 1)
+            if cancel_event.is_set():
+                self.cancelled += 1
+                if not self._closed and self._exchange is None:
+                    self._candidates.appendleft(text)
+                return
+        if answer:
+            self.cache.put(self.key(text), answer, prefetched=True)
+            self.generated += 1
+            self.logger.debug(f"Prefetched answer for {text!r} in {elapsed:.2f}s")
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            wall = time.monotonic() - self._started
+            return {
+                'generated': self.generated,
+                'cancelled': self.cancelled,
+                'pending': len(self._candidates),
+                'busy_seconds': round(self.busy_seconds, 3),
+                'duty_cycle': self.busy_seconds / wall if wall else 0.0,
+                'cpu_budget': self.cpu_budget
+            }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._candidates.clear()
+            if self._current is not None:
+                self._current.set()
+            self._condition.notify()
+        self._thread.join(timeout=5)
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from .interactions import InteractionStore
+
+DEFAULT_PROFILE = {
+    "learning_style": "visual",
+    "difficulty_level": "high_school"
+}
+
+
+def load_profile(path: str = "data/student_profile.json",
+                 store: Optional[InteractionStore] = None) -> Dict[str, Any]:
+    """Read the student's settings.
+
+    A legacy `interaction_history` array is moved into the interaction store once and the
+    file is rewritten without it, so the profile stays a few bytes long.
+    """
+    logger = logging.getLogger(__name__)
+    profile = dict(DEFAULT_PROFILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile.update(json.load(f))
+    except FileNotFoundError:
+        return profile
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read student profile, using defaults: {e}")
+        return profile
+
+    history = profile.pop("interaction_history", None)
+    if history is not None and store is not None:
+        migrated = store.import_records(history)
+        # The history only leaves the profile file once it is committed to the store
+        if store.flush():
+            save_profile(profile, path, drop_history=True)
+            logger.info(f"Migrated {migrated} interactions from {path} to {store.db_path}")
+        else:
+            logger.warning(f"Could not migrate interactions from {path}; will retry on next start")
+    return profile
+
+
+def save_profile(profile: Dict[str, Any], path: str = "data/student_profile.json", drop_history: bool = False):
+    """Write the settings atomically.
+
+    A legacy `interaction_history` still in the file is carried over unless `drop_history`
+    is set, which only load_profile does once the history has been migrated.
+    """
+    if not drop_history and "interaction_history" not in profile:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                history = json.load(f).get("interaction_history")
+        except (OSError, ValueError, AttributeError):
+            history = None
+        if history is not None:
+            profile = dict(profile, interaction_history=history)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(temp_path, path)
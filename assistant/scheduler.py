@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+PRIORITY_CLASSES = ("teacher", "voice", "typed", "background")
+
+# Classes exempt from per-session rate limits
+_UNLIMITED = ("teacher", "background")
+
+
+class QueryRejected(RuntimeError):
+    """The scheduler refused to run a query."""
+
+
+class RateLimited(QueryRejected):
+    pass
+
+
+class DeadlineExceeded(QueryRejected):
+    pass
+
+
+class _Waiter:
+    def __init__(self, priority: str, session_id: str, cost: float, enqueued: float, deadline: Optional[float]):
+        self.priority = priority
+        self.session_id = session_id
+        self.cost = cost
+        self.deadline = deadline
+        self.enqueued = enqueued
+        self.event = threading.Event()
+        self.granted = False
+        self.error: Optional[QueryRejected] = None
+
+
+class _ClassQueue:
+    """Deficit round robin over the sessions waiting in one priority class."""
+
+    def __init__(self, quantum: float):
+        self.quantum = quantum
+        self.ring = deque()
+        self.queues: Dict[str, deque] = {}
+        self.deficits: Dict[str, float] = {}
+        self.waits = deque(maxlen=512)
+        self.granted = 0
+        self.expired = 0
+        self.rate_limited = 0
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def push(self, waiter: _Waiter):
+        queue = self.queues.get(waiter.session_id)
+        if queue is None:
+            queue = self.queues[waiter.session_id] = deque()
+            self.deficits[waiter.session_id] = 0.0
+            self.ring.append(waiter.session_id)
+        queue.append(waiter)
+
+    def remove(self, waiter: _Waiter):
+        queue = self.queues.get(waiter.session_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                self._retire(waiter.session_id)
+
+    def _retire(self, session_id: str):
+        del self.queues[session_id]
+        del self.deficits[session_id]
+        self.ring.remove(session_id)
+
+    def pop(self, now: float) -> Optional[_Waiter]:
+        while self.ring:
+            session_id = self.ring[0]
+            queue = self.queues[session_id]
+            while queue and queue[0].deadline is not None and queue[0].deadline <= now:
+                expired = queue.popleft()
+                expired.error = DeadlineExceeded(f"{expired.priority} query expired after "
+                                                 f"{now - expired.enqueued:.1f}s in the queue")
+                self.expired += 1
+                expired.event.set()
+            if not queue:
+                self._retire(session_id)
+                continue
+            if self.deficits[session_id] < queue[0].cost:
+                self.deficits[session_id] += self.quantum
+                if self.deficits[session_id] < queue[0].cost:
+                    self.ring.rotate(-1)
+                    continue
+            waiter = queue.popleft()
+            self.deficits[session_id] -= waiter.cost
+            if not queue:
+                self._retire(session_id)
+            elif self.deficits[session_id] < queue[0].cost:
+                # Turn over: the next session goes first
+                self.ring.rotate(-1)
+            return waiter
+        return None
+
+
+class QueryScheduler:
+    """Grants the single model slot to waiting queries.
+
+    Replaces a plain FIFO lock. Higher priority classes always go first (teacher, voice,
+    typed, then background); within a class, sessions take turns by deficit round robin, so
+    one student firing questions cannot starve the rest. Sessions are also rate limited
+    with a token bucket, and a query still waiting at its deadline is dropped with
+    DeadlineExceeded instead of being answered late.
+    """
+
+    def __init__(self, rate_per_minute: float = 20.0, burst: int = 5, quantum: float = 1.0,
+                 deadlines: Optional[Dict[str, float]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.deadlines = deadlines or {}
+        self._classes = {priority: _ClassQueue(quantum) for priority in PRIORITY_CLASSES}
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._busy = False
+
+    @contextmanager
+    def slot(self, priority: str = "typed", session_id: Optional[str] = None, cost: float = 1.0,
+             deadline: Optional[float] = None, rate_limited: bool = True) -> Iterator[None]:
+        """Hold the model for the duration of the block.
+
+        `deadline` is seconds from now; it defaults to the class's configured deadline.
+        """
+        self.acquire(priority, session_id, cost, deadline, rate_limited)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, priority: str = "typed", session_id: Optional[str] = None, cost: float = 1.0,
+                deadline: Optional[float] = None, rate_limited: bool = True):
+        if priority not in self._classes:
+            raise ValueError(f"Unknown priority class {priority!r}; expected one of {PRIORITY_CLASSES}")
+        queue = self._classes[priority]
+        timeout = deadline if deadline is not None else self.deadlines.get(priority)
+        now = time.monotonic()
+        waiter = _Waiter(priority, session_id or "", cost, now, now + timeout if timeout else None)
+
+        with self._lock:
+            if rate_limited and priority not in _UNLIMITED and not self._take_token(waiter.session_id, now):
+                queue.rate_limited += 1
+                raise RateLimited(f"Session {session_id!r} is over {self.rate_per_minute:g} questions per minute")
+            if not self._busy:
+                self._busy = True
+                self._grant(waiter, now)
+                return
+            queue.push(waiter)
+
+        while True:
+            remaining = None if waiter.deadline is None else max(waiter.deadline - time.monotonic(), 0.0)
+            waiter.event.wait(remaining)
+            with self._lock:
+                if waiter.granted:
+                    return
+                if waiter.error is None and waiter.deadline is not None and time.monotonic() >= waiter.deadline:
+                    queue.remove(waiter)
+                    queue.expired += 1
+                    waiter.error = DeadlineExceeded(f"{priority} query expired after {timeout:g}s in the queue")
+            if waiter.error is not None:
+                raise waiter.error
+
+    def release(self):
+        with self._lock:
+            now = time.monotonic()
+            for priority in PRIORITY_CLASSES:
+                waiter = self._classes[priority].pop(now)
+                if waiter is not None:
+                    self._grant(waiter, now)
+                    waiter.event.set()
+                    return
+            self._busy = False
+
+    def _grant(self, waiter: _Waiter, now: float):
+        queue = self._classes[waiter.priority]
+        waiter.granted = True
+        queue.granted += 1
+        queue.waits.append(now - waiter.enqueued)
+
+    def _take_token(self, session_id: str, now: float) -> bool:
+        bucket = self._buckets.get(session_id)
+        if bucket is None:
+            if len(self._buckets) > 1024:
+                # Forget sessions whose bucket has refilled; they are indistinguishable from new ones
+                refill = self.burst * 60.0 / self.rate_per_minute
+                self._buckets = {key: value for key, value in self._buckets.items() if now - value[1] < refill}
+            bucket = self._buckets[session_id] = [float(self.burst), now]
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_minute / 60.0)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1.0
+        return True
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._classes.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            report = {}
+            for priority, queue in self._classes.items():
+                waits = sorted(queue.waits)
+                report[priority] = {
+                    'queued': len(queue),
+                    'granted': queue.granted,
+                    'expired': queue.expired,
+                    'rate_limited': queue.rate_limited,
+                    'wait_mean_ms': round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                    'wait_p95_ms': round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                    'wait_max_ms': round(waits[-1] * 1000, 1) if waits else 0.0
+                }
+            return report
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_SESSION = "default"
+
+
+class Session:
+    """Conversation history, engagement state and profile of one student.
+
+    History and engagement samples are kept in bounded deques, so a session's footprint
+    cannot grow without limit however long the student keeps asking.
+    """
+
+    def __init__(self, session_id: str, profile: Optional[Dict[str, Any]] = None,
+                 max_history: int = 20, max_engagement: int = 100):
+        self.session_id = session_id
+        self.profile = profile if profile is not None else {}
+        self.history = deque(maxlen=max_history)
+        self.engagement = None
+        self.engagement_history = deque(maxlen=max_engagement)
+        self.last_active = datetime.now().isoformat()
+        self._pins = 0
+        self._size = None
+
+    def record_exchange(self, prompt: str, answer: str):
+        self.history.append((prompt, answer))
+        self.touch()
+
+    def update_engagement(self, state: str):
+        self.engagement = state
+        self.engagement_history.append((datetime.now().isoformat(), state))
+        self.touch()
+
+    def clear_history(self):
+        self.history.clear()
+        self.touch()
+
+    def touch(self):
+        self.last_active = datetime.now().isoformat()
+        self._size = None
+
+    def memory_bytes(self) -> int:
+        """Approximate heap footprint; cached until the session next changes."""
+        if self._size is None:
+            size = sys.getsizeof(self) + sys.getsizeof(self.history) + sys.getsizeof(self.engagement_history)
+            size += sum(sys.getsizeof(prompt) + sys.getsizeof(answer) for prompt, answer in self.history)
+            size += sum(sys.getsizeof(ts) + sys.getsizeof(state) for ts, state in self.engagement_history)
+            size += len(json.dumps(self.profile))
+            self._size = size
+        return self._size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'session_id': self.session_id,
+            'profile': self.profile,
+            'history': list(self.history),
+            'engagement': self.engagement,
+            'engagement_history': list(self.engagement_history),
+            'last_active': self.last_active
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_history: int = 20, max_engagement: int = 100) -> "Session":
+        session = cls(data['session_id'], data.get('profile'), max_history, max_engagement)
+        session.history.extend(tuple(item) for item in data.get('history', []))
+        session.engagement = data.get('engagement')
+        session.engagement_history.extend(tuple(item) for item in data.get('engagement_history', []))
+        session.last_active = data.get('last_active', session.last_active)
+        return session
+
+
+class SessionManager:
+    """Per-student sessions sharing one model.
+
+    Recently used sessions stay in memory; once there are more than `max_sessions` or their
+    combined size passes `max_memory_bytes`, the least recently used ones are written to
+    `session_dir` and dropped, then reloaded transparently on their next request. Sessions
+    in use (see `use`) are never evicted.
+    """
+
+    def __init__(self, session_dir: str = "data/sessions", max_sessions: int = 32,
+                 max_memory_bytes: int = 8 * 1024 * 1024, max_history: int = 20,
+                 default_profile: Optional[Dict[str, Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.session_dir = session_dir
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.max_history = max_history
+        self.default_profile = default_profile or {}
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._evictions = 0
+        self._reloads = 0
+
+    @contextmanager
+    def use(self, session_id: Optional[str] = None) -> Iterator[Session]:
+        """Yield the session, pinned in memory for the duration of the block."""
+        session = self.get(session_id, pin=True)
+        try:
+            yield session
+        finally:
+            with self._lock:
+                session._pins -= 1
+                self._enforce_limits()
+
+    def get(self, session_id: Optional[str] = None, pin: bool = False) -> Session:
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._load(session_id)
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+            if pin:
+                session._pins += 1
+            self._enforce_limits()
+            return session
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.session_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', session_id) + ".json")
+
+    def _load(self, session_id: str) -> Session:
+        try:
+            with open(self._path(session_id), "r", encoding="utf-8") as f:
+                session = Session.from_dict(json.load(f), self.max_history)
+            self._reloads += 1
+            return session
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Could not reload session {session_id}, starting fresh: {e}")
+        return Session(session_id, dict(self.default_profile), self.max_history)
+
+    def _save(self, session: Session) -> bool:
+        path = self._path(session.session_id)
+        try:
+            os.makedirs(self.session_dir, exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(session.to_dict(), f)
+            os.replace(path + ".tmp", path)
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to save session {session.session_id}: {e}")
+            return False
+
+    def _memory_bytes(self) -> int:
+        return sum(session.memory_bytes() for session in self._sessions.values())
+
+    def _enforce_limits(self):
+        total = self._memory_bytes()
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and total <= self.max_memory_bytes:
+                break
+            session = self._sessions[session_id]
+            if session._pins or not self._save(session):
+                continue
+            total -= session.memory_bytes()
+            del self._sessions[session_id]
+            self._evictions += 1
+            self.logger.debug(f"Evicted session {session_id} to disk")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = {session_id: session.memory_bytes() for session_id, session in self._sessions.items()}
+            return {
+                'sessions_in_memory': len(sizes),
+                'memory_bytes': sum(sizes.values()),
+                'max_memory_bytes': self.max_memory_bytes,
+                'largest_session_bytes': max(sizes.values(), default=0),
+                'evictions': self._evictions,
+                'reloads': self._reloads
+            }
+
+    def close(self):
+        """Write every in-memory session to disk."""
+        with self._lock:
+            for session in self._sessions.values():
+                self._save(session)
@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple, Type
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.duration = 0.0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    A caller whose key matches a call already in flight (including one still queued for the
+    model) waits for it and gets the same result instead of starting its own. If the shared
+    call fails with one of `retry_on`, which is about the leader rather than the work (its
+    rate limit, its deadline), the waiters try again, one of them as the new leader.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           retry_on: Tuple[Type[BaseException], ...] = ()) -> Tuple[Any, bool]:
+        """Return (result, shared); shared is True when another caller's run was reused."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.waiters += 1
+                    leader = False
+                else:
+                    call = self._calls[key] = _Call()
+                    self.executed += 1
+                    leader = True
+            if leader:
+                break
+
+            call.done.wait()
+            if call.error is not None:
+                if isinstance(call.error, retry_on):
+                    continue
+                raise call.error
+            with self._lock:
+                self.coalesced += 1
+                self.saved_seconds += call.duration
+            return call.result, True
+
+        start = time.perf_counter()
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            call.duration = time.perf_counter() - start
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                self.logger.info(f"Shared one generation with {call.waiters} identical queries")
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.executed + self.coalesced
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'saved_generations': self.coalesced,
+                'coalesce_rate': self.coalesced / requests if requests else 0.0,
+                'saved_seconds': round(self.saved_seconds, 3)
+            }
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .text import normalize_query
+
+
+class _Speculation:
+    def __init__(self, text: str):
+        self.text = text
+        self.key = normalize_query(text)
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.answer = None
+        self.started = time.monotonic()
+        self.finished = None
+
+
+class SpeculativeQueryRunner:
+    """Starts answering a voice query before the final transcript is in.
+
+    When the streaming recognizer's partial transcript has not changed for
+    `stability_window` seconds, generation starts for it in the background. take() then
+    hands the answer over if the final transcript normalizes to the same text, and cancels
+    it otherwise. `generate(text, cancel_event)` must return None when cancelled.
+    """
+
+    def __init__(self, generate: Callable[[str, threading.Event], Optional[str]],
+                 stability_window: float = 0.6, min_words: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.generate = generate
+        self.stability_window = stability_window
+        self.min_words = min_words
+        self._lock = threading.Lock()
+        self._current = None
+        self._partial_key = None
+        self._partial_since = 0.0
+        self.started = 0
+        self.committed = 0
+        self.cancelled = 0
+        self.wasted_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def on_partial(self, text: str):
+        key = normalize_query(text)
+        now = time.monotonic()
+        speculation = None
+        with self._lock:
+            if key != self._partial_key:
+                self._partial_key = key
+                self._partial_since = now
+                if self._current and self._current.key != key:
+                    self._cancel_locked()
+                return
+            if (self._current is None and now - self._partial_since >= self.stability_window
+                    and len(key.split()) >= self.min_words):
+                self._current = speculation = _Speculation(text)
+                self.started += 1
+        if speculation is not None:
+            threading.Thread(target=self._run, args=(speculation,), name="speculative-query", daemon=True).start()
+
+    def _run(self, speculation: _Speculation):
+        try:
+            speculation.answer = self.generate(speculation.text, speculation.cancel_event)
+        except Exception as e:
+            self.logger.error(f"Speculative generation failed: {e}")
+        finally:
+            speculation.finished = time.monotonic()
+            speculation.done.set()
+
+    def take(self, query: str) -> Optional[str]:
+        """Return the speculative answer for this final query, or None if it has to be generated normally."""
+        with self._lock:
+            speculation, self._current = self._current, None
+            self._partial_key = None
+        if speculation is None:
+            return None
+
+        if speculation.key != normalize_query(query):
+            self._cancel(speculation)
+            return None
+
+        arrived = time.monotonic()
+        speculation.done.wait()
+        if speculation.answer is None:
+            self._cancel(speculation)
+            return None
+        with self._lock:
+            self.committed += 1
+            self.saved_seconds += min(arrived, speculation.finished) - speculation.started
+        self.logger.info(f"Speculative answer committed: {self.stats()}")
+        return speculation.answer
+
+    def cancel(self):
+        with self._lock:
+            self._partial_key = None
+            self._cancel_locked()
+
+    def _cancel_locked(self):
+        speculation, self._current = self._current, None
+        if speculation is not None:
+            threading.Thread(target=self._cancel, args=(speculation,), daemon=True).start()
+
+    def _cancel(self, speculation: _Speculation):
+        speculation.cancel_event.set()
+        speculation.done.wait()
+        with self._lock:
+            self.cancelled += 1
+            self.wasted_seconds += speculation.finished - speculation.started
+        self.logger.info(f"Speculative answer discarded: {self.stats()}")
+
+    def stats(self) -> Dict[str, float]:
+        resolved = self.committed + self.cancelled
+        return {
+            'started': self.started,
+            'committed': self.committed,
+            'cancelled': self.cancelled,
+            'success_rate': self.committed / resolved if resolved else 0.0,
+            'waste_rate': self.cancelled / resolved if resolved else 0.0,
+            'saved_seconds': round(self.saved_seconds, 3),
+            'wasted_seconds': round(self.wasted_seconds, 3),
+            'stability_window': self.stability_window
+        }
@@ -0,0 +1,359 @@
+import hashlib
+import io
+import itertools
+import logging
+import os
+import queue
+import re
+import threading
+import wave
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Lower values are spoken first
+PRIORITY_PROMPT = 0
+PRIORITY_ANSWER = 1
+PRIORITY_TIP = 2
+PRIORITY_BACKGROUND = 9
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def split_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """Split text into sentences, folding very short fragments into the next one."""
+    sentences = []
+    pending = ""
+    for part in _SENTENCE_END.split(text):
+        part = part.strip(" -\t")
+        if not part:
+            continue
+        pending = f"{pending} {part}".strip()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences and len(pending) < min_chars // 2:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+def _wav_duration(data: bytes) -> float:
+    with wave.open(io.BytesIO(data)) as wav:
+        return wav.getnframes() / float(wav.getframerate() or 1)
+
+
+class PhraseCache:
+    """Rendered WAV audio keyed by text, voice, rate and volume, on disk with a small in-memory LRU.
+
+    The directory is bounded too: past `max_disk_bytes`, the least recently played clips
+    (by file mtime, refreshed on every hit) are deleted.
+    """
+
+    def __init__(self, cache_dir: str = "data/tts_cache", max_memory_bytes: int = 16 * 1024 * 1024,
+                 max_disk_bytes: int = 64 * 1024 * 1024):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_bytes = sum(entry.stat().st_size for entry in self._clips())
+
+    def _clips(self):
+        return [entry for entry in os.scandir(self.cache_dir)
+                if entry.name.endswith(".wav") and not entry.name.endswith(".tmp.wav")]
+
+    @staticmethod
+    def key(text: str, voice: str, rate: int, volume: float) -> str:
+        return hashlib.sha1(f"{voice}|{rate}|{volume:.2f}|{text.strip()}".encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        path = self.path_for(key)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self._touch(path)
+                return path, data
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            _wav_duration(data)
+        except (OSError, EOFError, wave.Error):
+            with self._lock:
+                self.misses += 1
+            return None
+        self._touch(path)
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, data)
+        return path, data
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.max_memory_bytes:
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self, keep: str):
+        with self._lock:
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            try:
+                clips = sorted(self._clips(), key=lambda entry: entry.stat().st_mtime)
+            except OSError as e:
+                self.logger.warning(f"Could not scan speech cache: {e}")
+                return
+            for entry in clips:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                if entry.path == keep:
+                    continue
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                self._disk_bytes -= size
+                self.evicted += 1
+                # winsound plays from the file, so the in-memory copy must go too
+                data = self._memory.pop(entry.name[:-len(".wav")], None)
+                if data is not None:
+                    self._memory_bytes -= len(data)
+
+    def render(self, engine, text: str, key: str,
+               interrupted: Callable[[], bool] = lambda: False) -> Optional[Tuple[str, bytes]]:
+        """Synthesize text to a WAV file with the given engine; must run on the engine's thread.
+
+        A render that `interrupted` reports as cut short is discarded, never cached.
+        """
+        path = self.path_for(key)
+        tmp_path = f"{path}.tmp.wav"
+        try:
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+            if interrupted():
+                os.remove(tmp_path)
+                return None
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes += os.path.getsize(path)
+        except Exception as e:
+            self.logger.warning(f"Could not cache speech for {text[:40]!r}: {e}")
+            return None
+        self._evict_disk(keep=path)
+        return self.get(key)
+
+
+class WavPlayer:
+    """Plays cached WAV audio with winsound (Windows) or simpleaudio if either is available."""
+
+    def __init__(self):
+        self.backend = None
+        self._stop = threading.Event()
+        try:
+            import winsound
+            self._winsound = winsound
+            self.backend = "winsound"
+        except ImportError:
+            try:
+                import simpleaudio
+                self._simpleaudio = simpleaudio
+                self.backend = "simpleaudio"
+            except ImportError:
+                pass
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def reset(self):
+        """Forget an earlier stop(); called before deciding to play, never inside play()."""
+        self._stop.clear()
+
+    def play(self, path: str, data: bytes):
+        duration = _wav_duration(data)
+        if self.backend == "winsound":
+            # winsound cannot play from memory asynchronously, so it plays the cached file
+            self._winsound.PlaySound(path, self._winsound.SND_FILENAME | self._winsound.SND_ASYNC | self._winsound.SND_NODEFAULT)
+            if self._stop.wait(duration):
+                self._winsound.PlaySound(None, 0)
+        else:
+            with wave.open(io.BytesIO(data)) as wav:
+                playback = self._simpleaudio.WaveObject.from_wave_read(wav).play()
+            if self._stop.wait(duration):
+                playback.stop()
+            else:
+                playback.wait_done()
+
+    def stop(self):
+        self._stop.set()
+
+
+class SpeechWorker:
+    """One long-lived thread that owns the pyttsx3 engine and speaks queued sentences.
+
+    Every utterance is tagged with the generation it was queued in; interrupt() and
+    pre-empting calls to say() start a new generation, so stale sentences still in the
+    queue are dropped instead of spoken. Utterances queued with cache=True play from the
+    phrase cache when rendered audio exists, and are rendered in the background otherwise.
+    """
+
+    def __init__(self, rate: int = 150, volume: float = 0.9, cache: Optional[PhraseCache] = None):
+        self.logger = logging.getLogger(__name__)
+        self.rate = rate
+        self.volume = volume
+        self.engine = None
+        self.voice = ""
+        self.player = WavPlayer()
+        self.cache = cache if self.player.available else None
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._active_generation = None
+        self.spoken = 0
+        self.played = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def say(self, text: str, priority: int = PRIORITY_ANSWER, preempt: bool = False, cache: bool = False,
+            whole: bool = False):
+        """Queue text for speech. Fixed phrases pass whole=True so they are cached as one clip."""
+        if not text:
+            return
+        with self._lock:
+            if preempt:
+                self._preempt()
+            generation = self._generation
+            for sentence in ([text.strip()] if whole else split_sentences(text)):
+                self._queue.put((priority, next(self._order), generation, "speak", sentence, cache))
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def prerender(self, phrases: Iterable[str]):
+        """Render phrases into the cache whenever the worker is otherwise idle."""
+        if self.cache is None:
+            return
+        for phrase in phrases:
+            self._queue.put((PRIORITY_BACKGROUND, next(self._order), None, "render", phrase, True))
+
+    def interrupt(self):
+        with self._lock:
+            self._preempt()
+
+    def _preempt(self):
+        # The engine is stopped by the worker itself (_on_engine_event), at the next word
+        self._generation += 1
+        self.player.stop()
+
+    def _on_engine_event(self, *args):
+        # Engine callbacks run on the worker thread, inside runAndWait
+        if self._active_generation is not None and self._active_generation != self._generation:
+            self.engine.stop()
+
+    def _cache_key(self, text: str) -> str:
+        return PhraseCache.key(text, self.voice, self.rate, self.volume)
+
+    def _run(self):
+        import pyttsx3
+
+        try:
+            # The engine is created on this thread and never touched by another one
+            self.engine = pyttsx3.init()
+            self.engine.setProperty('rate', self.rate)
+            self.engine.setProperty('volume', self.volume)
+            self.voice = str(self.engine.getProperty('voice') or "")
+            self.engine.connect('started-utterance', self._on_engine_event)
+            self.engine.connect('started-word', self._on_engine_event)
+        except Exception as e:
+            self.logger.error(f"Text-to-speech unavailable: {e}")
+            return
+        finally:
+            self._ready.set()
+
+        while True:
+            priority, _, generation, kind, text, cache = self._queue.get()
+            if text is None:
+                break
+            # Cleared before the generation check: a pre-empt landing after the check stays
+            # set and stops the clip as soon as it starts
+            self.player.reset()
+            if generation is not None and generation != self._generation:
+                self.dropped += 1
+                continue
+            # Background renders belong to the current generation, so a pre-empt stops them too
+            self._active_generation = generation if generation is not None else self._generation
+            try:
+                if kind == "render":
+                    key = self._cache_key(text)
+                    if self.cache.get(key) is None:
+                        started = self._active_generation
+                        self.cache.render(self.engine, text, key, lambda: started != self._generation)
+                else:
+                    self._speak(text, cache)
+            except Exception as e:
+                self.logger.error(f"Text-to-speech failed: {e}")
+            finally:
+                self._active_generation = None
+
+    def _speak(self, text: str, cache: bool):
+        if cache and self.cache is not None:
+            key = self._cache_key(text)
+            clip = self.cache.get(key)
+            if clip is not None:
+                self.player.play(*clip)
+                self.played += 1
+                return
+            # Speak it live now and store the audio once the queue is idle
+            self._queue.put((PRIORITY_BACKGROUND, next(self._order), None, "render", text, True))
+
+        self.engine.say(text)
+        self.engine.runAndWait()
+        self.spoken += 1
+
+    def stats(self) -> Dict[str, int]:
+        stats = {
+            'queue_depth': self.queue_depth,
+            'max_depth': self.max_depth,
+            'spoken': self.spoken,
+            'played_from_cache': self.played,
+            'dropped': self.dropped
+        }
+        if self.cache is not None:
+            stats.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses,
+                         cache_evicted=self.cache.evicted)
+        return stats
+
+    def shutdown(self):
+        self.interrupt()
+        self._queue.put((-1, next(self._order), None, "stop", None, False))
+        self._thread.join(timeout=2)
@@ -0,0 +1,60 @@
+import json
+import logging
+import os
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class TranscriptArchive:
+    """Append-only JSON-lines record of every chat message in a session.
+
+    Byte offsets of each line are kept in memory, so any range of messages can be read
+    back without scanning the file.
+    """
+
+    def __init__(self, archive_dir: str = "data/transcripts", session_id: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.session_id = session_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join(archive_dir, f"session_{self.session_id}.jsonl")
+        self._offsets = array('Q')
+        self._count = 0
+        self._file = None
+        try:
+            os.makedirs(archive_dir, exist_ok=True)
+            self._file = open(self.path, 'ab')
+        except OSError as e:
+            self.logger.warning(f"Chat transcript will not be archived: {e}")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, sender: str, text: str, tag: str) -> int:
+        index = self._count
+        self._count += 1
+        if self._file is None:
+            return index
+        record = {'timestamp': datetime.now().isoformat(), 'sender': sender, 'text': text, 'tag': tag}
+        try:
+            offset = self._file.tell()
+            self._file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            self._file.flush()
+            self._offsets.append(offset)
+        except OSError as e:
+            self.logger.error(f"Transcript archive write failed: {e}")
+            self._file = None
+        return index
+
+    def read(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Messages with start <= index < end that made it to disk."""
+        start, end = max(0, start), min(end, len(self._offsets))
+        if start >= end:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self._offsets[start])
+            return [json.loads(f.readline()) for _ in range(end - start)]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
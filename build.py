@@ -1,10 +1,57 @@
+"""Package the assistant with PyInstaller.
+
+    python build.py                  # single-file executable (the original build)
+    python build.py --profile slim   # directory bundle: no per-launch extraction, dead modules left out
+
+The slim profile never bundles model weights: they are loaded from the Hugging Face cache,
+or from the directory in CLASSROOM_MODEL_CACHE, so several builds share one copy. Measure
+the result with `python -m tools.cold_start --exe dist/Classroom_Assistant_v2/Classroom_Assistant_v2`.
+"""
+
+import argparse
+import os
+
 import PyInstaller.__main__
 
-PyInstaller.__main__.run([
-    'main.py',
-    '--onefile',
-    '--windowed',
-    '--add-data=assets;assets',
-    '--icon=assets/icon.ico',
-    '--name=Classroom_Assistant_v2'
-])
\ No newline at end of file
+NAME = 'Classroom_Assistant_v2'
+
+# Pulled in by torch/transformers' optional integrations but never used by the assistant
+SLIM_EXCLUDES = [
+    'torch.utils.tensorboard', 'tensorboard', 'torchvision', 'torchaudio', 'caffe2',
+    'torch.testing._internal', 'tensorflow', 'keras', 'flax', 'jax', 'jaxlib',
+    'transformers.onnx', 'transformers.pipelines', 'transformers.benchmark',
+    'pandas', 'scipy', 'sklearn', 'matplotlib', 'IPython', 'jupyter', 'notebook',
+    'pytest', 'sphinx', 'docx', 'pptx', 'tkinter.test',
+]
+
+
+def data_args():
+    args = []
+    for directory in ('assets', 'config', 'models'):
+        if os.path.isdir(directory):
+            args.append(f'--add-data={directory}{os.pathsep}{directory}')
+    if os.path.exists('assets/icon.ico'):
+        args.append('--icon=assets/icon.ico')
+    return args
+
+
+def onefile_args():
+    return ['main.py', '--onefile', '--windowed', f'--name={NAME}'] + data_args()
+
+
+def slim_args():
+    args = ['main.py', '--onedir', '--windowed', '--noconfirm', '--clean', f'--name={NAME}']
+    args += [f'--exclude-module={module}' for module in SLIM_EXCLUDES]
+    # The model directory only holds the small detector and ASR models, never LM weights
+    return args + data_args()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=('onefile', 'slim'), default='onefile')
+    args = parser.parse_args(argv)
+    PyInstaller.__main__.run(slim_args() if args.profile == 'slim' else onefile_args())
+
+
+if __name__ == '__main__':
+    main()
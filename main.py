@@ -1,54 +1,78 @@
-import tkinter as tk
-from assistant.core import ClassroomAssistant
-from assistant.interface import ClassroomUI
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
 import logging
-import os
-from datetime import datetime
+import multiprocessing
+import sys
 
-def configure_logging():
+from assistant.config import load_config
+from assistant.log import configure_logging
+
+def setup_logging(console: bool = True):
     """Set up comprehensive logging"""
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = f"{log_dir}/assistant_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
+    logging_config = load_config().get("logging", {})
+    configure_logging(
+        console=console,
+        max_bytes=logging_config.get("max_bytes", 10 * 1024 * 1024),
+        backup_count=logging_config.get("backup_count", 5),
+        payload_sample_rate=logging_config.get("payload_sample_rate", 0.1),
+        max_payload_chars=logging_config.get("max_payload_chars", 2000)
     )
 
-def main():
-    configure_logging()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Teaching Assistant")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run a text REPL without the GUI, camera or speech output")
+    parser.add_argument("--ask", metavar="QUESTION",
+                        help="Answer a single question headlessly and exit")
+    parser.add_argument("--engagement", action="store_true",
+                        help="Track engagement from the camera in headless mode")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="Report how long startup takes")
+    return parser.parse_args(argv)
+
+def run_gui(args):
     logger = logging.getLogger(__name__)
-    
+
     try:
+        import tkinter as tk
+        from assistant.core import ClassroomAssistant
+        from assistant.interface import ClassroomUI
+
         root = tk.Tk()
         root.title("AI Teaching Assistant")
         root.geometry("1200x800")
-        
+
         # Center window on screen
         screen_width = root.winfo_screenwidth()
         screen_height = root.winfo_screenheight()
         x = (screen_width - 1200) // 2
         y = (screen_height - 800) // 2
         root.geometry(f"1200x800+{x}+{y}")
-        
+
         logger.info("Initializing AI Teaching Assistant...")
         assistant = ClassroomAssistant()
         ui = ClassroomUI(root, assistant)
-        
+
         def on_closing():
             logger.info("Closing application...")
             ui.cleanup()
             root.destroy()
-            
+
+        def report_first_window():
+            from assistant.cli import report_startup
+
+            elapsed = time.perf_counter() - _PROCESS_START
+            logger.info(f"First window after {elapsed:.3f}s")
+            report_startup({'first_window': elapsed}, echo=args.startup_time)
+
         root.protocol("WM_DELETE_WINDOW", on_closing)
+        root.after_idle(report_first_window)
         logger.info("Starting main application loop")
         root.mainloop()
-        
+
     except ImportError as e:
         logger.critical(f"Missing dependency: {e}")
         print(f"ERROR: Please install required packages - {e}")
@@ -58,5 +82,18 @@ def main():
     finally:
         logger.info("Application shutdown complete")
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.headless or args.ask:
+        setup_logging(console=False)
+        from assistant.cli import run
+        return run(args, _PROCESS_START)
+
+    setup_logging()
+    run_gui(args)
+    return 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # The camera workers are spawned processes; a frozen build has to dispatch them here
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Run WAV fixtures through a speech recognition backend without a microphone.
+
+Reports real-time factor, end-of-speech-to-text latency, time to first partial and, when a
+same-named .txt transcript sits next to a WAV file, the word error rate:
+
+    python -m tools.benchmark_asr fixtures/ --backend vosk
+    python -m tools.benchmark_asr question.wav --backend vosk --realtime
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from assistant.asr import create_asr_backend, transcribe_wav
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return float(bool(hyp))
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1] / len(ref)
+
+
+def collect_wavs(paths: List[str]) -> List[str]:
+    wavs = []
+    for path in paths:
+        if os.path.isdir(path):
+            wavs.extend(os.path.join(path, n) for n in sorted(os.listdir(path)) if n.lower().endswith(".wav"))
+        else:
+            wavs.append(path)
+    return wavs
+
+
+def _fmt(value, spec: str, unit: str = "") -> str:
+    return '-' if value is None else f"{value:{spec}}{unit}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="WAV files or directories of WAV files (16-bit mono)")
+    parser.add_argument("--backend", default="vosk")
+    parser.add_argument("--model-path", help="Model directory for the vosk backend")
+    parser.add_argument("--frame-ms", type=int, default=30)
+    parser.add_argument("--realtime", action="store_true", help="Pace frames like a live microphone")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    options = {'model_path': args.model_path} if args.model_path else {}
+    backend = create_asr_backend(args.backend, **options)
+
+    results = []
+    for path in collect_wavs(args.paths):
+        result = transcribe_wav(backend, path, args.frame_ms, args.realtime)
+        result['file'] = path
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                result['wer'] = word_error_rate(f.read(), result['text'])
+        results.append(result)
+
+        # Empty or zero-length files have no real-time factor or end-of-speech latency
+        print(f"{os.path.basename(path)}: RTF {_fmt(result['real_time_factor'], '.3f')}, "
+              f"EOS->text {_fmt(result['eos_to_text_ms'], '.1f', ' ms')}, "
+              f"first partial {_fmt(result['first_partial_ms'], '.0f', ' ms')}"
+              + (f", WER {result['wer']:.1%}" if 'wer' in result else "")
+              + f"\n    {result['text']!r}")
+
+    if not results:
+        print("No WAV files found", file=sys.stderr)
+        return 1
+
+    audio = sum(r['audio_seconds'] for r in results)
+    eos = sorted(r['eos_to_text_ms'] for r in results if r['eos_to_text_ms'] is not None)
+    print(f"\n{len(results)} files, {audio:.1f} s of audio, "
+          f"median EOS->text {_fmt(eos[len(eos) // 2] if eos else None, '.1f', ' ms')}, "
+          f"max {_fmt(eos[-1] if eos else None, '.1f', ' ms')}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({'backend': args.backend, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
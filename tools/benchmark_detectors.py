@@ -0,0 +1,150 @@
+"""Replay recorded frames through EngagementDetector.analyze_frame for each face detector backend.
+
+Runs headless, no camera required:
+
+    python -m tools.benchmark_detectors recording.mp4 --backends haar lbp dnn
+    python -m tools.benchmark_detectors frames/ --backends haar --scale-factors 1.05 1.1 1.2 --min-neighbors 3 5 7
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from assistant.detectors import box_iou
+from assistant.engagement import EngagementDetector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_frames(source: str, size: Tuple[int, int], max_frames: Optional[int] = None) -> List[np.ndarray]:
+    """Decode the whole source up front so decode cost does not pollute detector latency."""
+    frames = []
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                frames.append(cv2.resize(frame, size))
+    else:
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            raise RuntimeError(f"Could not open video source: {source}")
+        try:
+            while max_frames is None or len(frames) < max_frames:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(cv2.resize(frame, size))
+        finally:
+            cap.release()
+    if not frames:
+        raise RuntimeError(f"No frames found in {source}")
+    return frames
+
+
+def backend_configs(args) -> List[Tuple[str, str, Dict[str, object]]]:
+    configs = []
+    for backend in args.backends:
+        if backend == "dnn":
+            configs.append(("dnn", backend, {}))
+            continue
+        for scale_factor, min_neighbors in itertools.product(args.scale_factors, args.min_neighbors):
+            options = {'scale_factor': scale_factor, 'min_neighbors': min_neighbors}
+            configs.append((f"{backend} sf={scale_factor} mn={min_neighbors}", backend, options))
+    return configs
+
+
+def run_backend(backend: str, options: Dict[str, object], frames: List[np.ndarray], warmup: int):
+    detector = EngagementDetector(log_dir=None, backend=backend, detector_options=options)
+    for frame in frames[:warmup]:
+        detector.analyze_frame(frame)
+
+    latencies = []
+    detections = []
+    states = []
+    start = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        result = detector.analyze_frame(frame)
+        latencies.append(time.perf_counter() - t0)
+        detections.append(detector.last_faces[0] if detector.last_faces else None)
+        states.append(result['state'])
+    elapsed = time.perf_counter() - start
+    detector.close()
+    return np.array(latencies), detections, states, elapsed
+
+
+def agreement(reference: List, other: List, ref_states: List[str], other_states: List[str]) -> Dict[str, float]:
+    presence = np.mean([(a is None) == (b is None) for a, b in zip(reference, other)])
+    ious = [box_iou(a, b) for a, b in zip(reference, other) if a is not None and b is not None]
+    same_state = np.mean([a == b for a, b in zip(ref_states, other_states)])
+    return {
+        'presence_agreement': float(presence),
+        'mean_iou': float(np.mean(ious)) if ious else 0.0,
+        'state_agreement': float(same_state)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Video file or directory of frames")
+    parser.add_argument("--backends", nargs="+", default=["haar"], choices=["haar", "lbp", "dnn"])
+    parser.add_argument("--scale-factors", nargs="+", type=float, default=[1.1])
+    parser.add_argument("--min-neighbors", nargs="+", type=int, default=[5])
+    parser.add_argument("--size", default="320x240", help="Analysis resolution, matches the UI by default")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    frames = load_frames(args.source, (width, height), args.max_frames)
+    print(f"Loaded {len(frames)} frames at {width}x{height} from {args.source}")
+
+    results = []
+    reference = None
+    for label, backend, options in backend_configs(args):
+        try:
+            latencies, detections, states, elapsed = run_backend(backend, options, frames, args.warmup)
+        except RuntimeError as e:
+            print(f"{label}: skipped ({e})", file=sys.stderr)
+            continue
+
+        row = {
+            'config': label,
+            'fps': len(frames) / elapsed,
+            'p50_ms': float(np.percentile(latencies, 50) * 1000),
+            'p90_ms': float(np.percentile(latencies, 90) * 1000),
+            'p99_ms': float(np.percentile(latencies, 99) * 1000),
+            'detection_rate': sum(d is not None for d in detections) / len(frames)
+        }
+        if reference is None:
+            reference = (label, detections, states)
+        row.update(agreement(reference[1], detections, reference[2], states))
+        results.append(row)
+
+    if not results:
+        print("No backend could be benchmarked", file=sys.stderr)
+        return 1
+
+    print(f"\nAgreement is measured against: {reference[0]}")
+    print(f"{'config':<28}{'fps':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'detect':>8}{'present':>9}{'IoU':>7}{'state':>7}")
+    for row in results:
+        print(f"{row['config']:<28}{row['fps']:>8.1f}{row['p50_ms']:>9.2f}{row['p90_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+              f"{row['detection_rate']:>8.0%}{row['presence_agreement']:>9.0%}{row['mean_iou']:>7.2f}{row['state_agreement']:>7.0%}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({'source': args.source, 'frames': len(frames), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Compare the per-frame cost of the old and the preallocated webcam display paths.
+
+Measures CPU time and Python-visible allocations (tracemalloc) per frame for synthetic
+640x480 frames. The Tk photo step is included when a display is available:
+
+    python -m tools.benchmark_display --frames 300
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from assistant.display import FrameDisplay
+
+
+class _NullLabel:
+    def config(self, **kwargs):
+        pass
+
+
+def legacy_path(frame, with_tk: bool, holder: dict):
+    frame = cv2.resize(frame, (320, 240))
+    img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    img = Image.fromarray(img)
+    if with_tk:
+        holder['imgtk'] = ImageTk.PhotoImage(image=img)
+
+
+def measure(step, frames):
+    step(frames[0])
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    cpu = time.process_time()
+    for frame in frames:
+        step(frame)
+    cpu = time.process_time() - cpu
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+    return {
+        'cpu_ms_per_frame': cpu / len(frames) * 1000,
+        'retained_bytes': allocated,
+        'peak_traced_bytes': peak
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--no-tk", action="store_true", help="Skip the Tk photo step even if a display is available")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+
+    root = None
+    if not args.no_tk:
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+            root.withdraw()
+        except Exception as e:
+            print(f"No display available, measuring without the Tk photo step ({e})")
+
+    holder = {}
+    display = FrameDisplay(_NullLabel())
+    new_step = display.render if root else display.prepare
+
+    results = {
+        'legacy': measure(lambda f: legacy_path(f, root is not None, holder), frames),
+        'preallocated': measure(new_step, frames)
+    }
+    if root:
+        root.destroy()
+
+    print(f"{'path':<14}{'cpu ms/frame':>14}{'peak traced KB':>16}{'retained KB':>13}")
+    for name, row in results.items():
+        print(f"{name:<14}{row['cpu_ms_per_frame']:>14.3f}{row['peak_traced_bytes'] / 1024:>16.1f}"
+              f"{row['retained_bytes'] / 1024:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Measure cold start: process launch to first window and to first answer.
+
+Each run launches a fresh process, so interpreter start-up, bundle extraction and imports are
+included. The app appends its own timings to $CLASSROOM_STARTUP_REPORT, which also works for
+windowed builds that have no console:
+
+    python -m tools.cold_start --runs 5
+    python -m tools.cold_start --exe dist/Classroom_Assistant_v2/Classroom_Assistant_v2 --label v2.1
+    python -m tools.cold_start --skip-window --history cold_start.jsonl --label v2.1
+
+With --history, each result is appended as one JSON line so releases can be compared.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_QUESTION = "What is photosynthesis?"
+
+
+def launch(command: List[str], wait_for: str, timeout: float) -> Optional[Dict[str, float]]:
+    """Run command until it reports `wait_for`; return its timings plus the outside launch-to-report time."""
+    with tempfile.TemporaryDirectory(prefix="cold-start-") as temp_dir:
+        report_path = os.path.join(temp_dir, "startup.jsonl")
+        env = dict(os.environ, CLASSROOM_STARTUP_REPORT=report_path)
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while time.perf_counter() - start < timeout:
+                exited = process.poll() is not None
+                if os.path.exists(report_path):
+                    with open(report_path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            timings = json.loads(line)
+                            if wait_for in timings:
+                                timings['launch_to_' + wait_for] = time.perf_counter() - start
+                                return timings
+                if exited:
+                    return None
+                time.sleep(0.01)
+            return None
+        finally:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        'median_s': round(ordered[len(ordered) // 2], 3),
+        'min_s': round(ordered[0], 3),
+        'max_s': round(ordered[-1], 3)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exe", help="Packaged executable to launch (default: python main.py)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--question", default=DEFAULT_QUESTION)
+    parser.add_argument("--skip-window", action="store_true", help="Only measure the headless first answer")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for each launch")
+    parser.add_argument("--label", help="Release or build name recorded with the result")
+    parser.add_argument("--history", help="Append the result to this JSON-lines file")
+    args = parser.parse_args(argv)
+
+    base = [args.exe] if args.exe else [sys.executable, "main.py"]
+    scenarios = [] if args.skip_window else [('first_window', base)]
+    scenarios.append(('first_answer', base + ["--ask", args.question]))
+
+    result = {'label': args.label, 'timestamp': datetime.now().isoformat(), 'command': base, 'runs': args.runs}
+    for name, command in scenarios:
+        measured = []
+        for run in range(args.runs):
+            timings = launch(command, name, args.timeout)
+            if timings is None:
+                print(f"{name} run {run + 1}: exited or timed out without reporting {name}",
+                      file=sys.stderr)
+                continue
+            measured.append(timings)
+            print(f"{name} run {run + 1}: launch to {name.replace('_', ' ')} "
+                  f"{timings['launch_to_' + name]:.2f}s")
+        if not measured:
+            return 1
+        result[name] = summarize([timings['launch_to_' + name] for timings in measured])
+        # The in-process breakdown of the median run
+        result[name]['in_process'] = sorted(measured, key=lambda t: t['launch_to_' + name])[len(measured) // 2]
+
+    for name, _ in scenarios:
+        summary = result[name]
+        print(f"Launch to {name.replace('_', ' ')}: median {summary['median_s']}s "
+              f"(min {summary['min_s']}s, max {summary['max_s']}s)")
+
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
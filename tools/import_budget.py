@@ -0,0 +1,97 @@
+"""Summarize import cost per assistant subsystem and enforce an import-time budget.
+
+Each subsystem's import statement runs in a fresh interpreter under `python -X importtime`.
+The report shows the median cumulative import time over several runs and the packages that
+contribute most. The command exits non-zero when a subsystem exceeds its budget:
+
+    python -m tools.import_budget
+    python -m tools.import_budget --subsystems core cli --repeat 5
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+BUDGET_PATH = os.path.join("config", "import_budget.json")
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def _importtime(statement: str) -> List[Tuple[int, int, int, str]]:
+    """Return (self_us, cumulative_us, depth, module) for every import the statement triggers."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, cwd=os.getcwd())
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, module))
+    return entries
+
+
+def _baseline() -> Set[str]:
+    return {module for _, _, _, module in _importtime("pass")}
+
+
+def measure(statement: str, baseline: Set[str]) -> Tuple[float, Dict[str, float]]:
+    total_us = 0
+    by_package = defaultdict(float)
+    for self_us, cumulative_us, depth, module in _importtime(statement):
+        if module in baseline:
+            continue
+        if depth == 0:
+            total_us += cumulative_us
+        by_package[module.split(".")[0]] += self_us / 1000
+    return total_us / 1000, dict(by_package)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets", default=BUDGET_PATH)
+    parser.add_argument("--subsystems", nargs="+", help="Only measure these subsystems")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="Packages to list per subsystem")
+    args = parser.parse_args(argv)
+
+    with open(args.budgets, "r", encoding="utf-8") as f:
+        subsystems = json.load(f)
+    names = args.subsystems or list(subsystems)
+
+    baseline = _baseline()
+    failures = []
+    print(f"{'subsystem':<16}{'median ms':>10}{'budget ms':>11}  heaviest packages")
+    for name in names:
+        spec = subsystems[name]
+        try:
+            runs = [measure(spec["statement"], baseline) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{name:<16}{'error':>10}{'':>11}  {e}")
+            failures.append(name)
+            continue
+
+        median = statistics.median(total for total, _ in runs)
+        packages = runs[-1][1]
+        heaviest = ", ".join(f"{pkg} {ms:.0f}" for pkg, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top])
+        budget = spec.get("budget_ms")
+        over = budget is not None and median > budget
+        if over:
+            failures.append(name)
+        budget_text = "-" if budget is None else f"{budget}"
+        print(f"{name:<16}{median:>10.1f}{budget_text:>11}  {heaviest}{'  OVER BUDGET' if over else ''}")
+
+    if failures:
+        print(f"\nFailed: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
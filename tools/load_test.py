@@ -0,0 +1,285 @@
+"""Simulate a classroom of students asking ClassroomAssistant questions at the same time.
+
+Each student is a thread that thinks for a random time, asks a question from the corpus and
+waits for the answer. Optionally synthetic webcam frames are analyzed alongside. Reports
+throughput, latency percentiles, scheduler queue depth and CPU/RSS over time:
+
+    python -m tools.load_test --students 30 --duration 120
+    python -m tools.load_test --students 10 --think 5 --frames-fps 15 --json load.json
+    python -m tools.load_test --model real --students 5 --corpus questions.txt
+
+The stub model (default) needs neither torch nor transformers and sleeps for a simulated
+decode time, so the run measures the assistant around the model rather than the model.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from assistant.core import ClassroomAssistant
+from assistant.models import rss_bytes
+
+DEFAULT_CORPUS = [
+    "What is photosynthesis?",
+    "How do plants make food?",
+    "What is gravity?",
+    "Why is the sky blue?",
+    "What is a fraction?",
+    "How do I add fractions with different denominators?",
+    "What is the water cycle?",
+    "Explain the difference between weather and climate",
+    "What is an atom?",
+    "What causes earthquakes?",
+    "What is a noun?",
+    "How does the heart pump blood?",
+    "What is the Pythagorean theorem?",
+    "Why do we have seasons?",
+    "What is democracy?",
+    "How do volcanoes form?",
+    "What is a prime number?",
+    "What is an ecosystem?",
+    "How does electricity work?",
+    "What is the difference between speed and velocity?",
+]
+
+
+class StubModels:
+    """Stands in for AIModels: answers after a simulated decode time, honouring cancellation."""
+
+    def __init__(self, tokens_per_second: float = 40.0, answer_tokens: int = 60, jitter: float = 0.3):
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.jitter = jitter
+        self.governor = None
+        self.model_name = "stub"
+        self.generation_config = None
+        self.generations = 0
+
+    def generate_educational_response(self, prompt: str, cancel_event: Optional[threading.Event] = None,
+                                      record_history: bool = True) -> Optional[str]:
+        tokens = max(1, int(self.answer_tokens * random.uniform(1 - self.jitter, 1 + self.jitter)))
+        start = time.perf_counter()
+        decode_seconds = tokens / self.tokens_per_second
+        if cancel_event is not None:
+            if cancel_event.wait(decode_seconds):
+                return None
+        else:
+            time.sleep(decode_seconds)
+        self.generations += 1
+        if self.governor:
+            self.governor.record_decode(tokens, time.perf_counter() - start)
+        return f"Here is a simulated explanation of {prompt.strip().rstrip('?')} for testing."
+
+    def _get_fallback_response(self, prompt: str = "") -> str:
+        return f"I'm thinking about your question: '{prompt.strip()}'. Could you rephrase it?"
+
+    def voice_input(self, on_partial=None):
+        return None
+
+    def close_audio(self):
+        pass
+
+    def interrupt(self):
+        pass
+
+    def clear_history(self):
+        pass
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class LoadTest:
+    def __init__(self, assistant: ClassroomAssistant, corpus: List[str], students: int, duration: float,
+                 think: float, voice_share: float, unique: bool, frames_fps: float, sample_interval: float):
+        self.assistant = assistant
+        self.corpus = corpus
+        self.students = students
+        self.duration = duration
+        self.think = think
+        self.voice_share = voice_share
+        self.unique = unique
+        self.frames_fps = frames_fps
+        self.sample_interval = sample_interval
+        self.results: List[Dict[str, Any]] = []
+        self.samples: List[Dict[str, Any]] = []
+        self.frame_times: List[float] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _student(self, index: int):
+        rng = random.Random(index)
+        session_id = f"student{index:03d}"
+        asked = 0
+        # Stagger the first question so the run does not start with one synchronized burst
+        if self._stop.wait(rng.uniform(0, self.think)):
+            return
+        while not self._stop.is_set():
+            query = rng.choice(self.corpus)
+            if self.unique:
+                query = f"{query} ({session_id} #{asked})"
+            priority = "voice" if rng.random() < self.voice_share else "typed"
+            start = time.perf_counter()
+            try:
+                response = self.assistant.process_query(query, session_id=session_id, priority=priority)
+                ok, cached = response.get('success', False), response.get('cached', False)
+            except Exception:
+                ok, cached = False, False
+            latency = time.perf_counter() - start
+            asked += 1
+            with self._lock:
+                self.results.append({'t': time.perf_counter() - self.started, 'latency': latency, 'ok': ok,
+                                     'cached': cached, 'priority': priority})
+            self._stop.wait(rng.expovariate(1 / self.think) if self.think > 0 else 0)
+
+    def _frames(self):
+        import numpy as np
+
+        detector = self.assistant.engagement_detector
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        interval = 1 / self.frames_fps
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            detector.analyze_frame(frame)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.frame_times.append(elapsed)
+            self._stop.wait(max(0.0, interval - elapsed))
+
+    def _sample(self):
+        last_wall, last_cpu, last_done = time.perf_counter(), time.process_time(), 0
+        while not self._stop.wait(self.sample_interval):
+            wall, cpu = time.perf_counter(), time.process_time()
+            with self._lock:
+                done = len(self.results)
+            rss = rss_bytes()
+            self.samples.append({
+                't': round(wall - self.started, 1),
+                'throughput_qps': round((done - last_done) / (wall - last_wall), 2),
+                'queue_depth': self.assistant.scheduler.queue_depth(),
+                'in_flight': self.assistant.inflight.in_flight(),
+                'cpu_percent': round((cpu - last_cpu) / (wall - last_wall) * 100, 1),
+                'rss_mb': round(rss / 2**20, 1) if rss else None
+            })
+            print("  ".join(f"{key}={value}" for key, value in self.samples[-1].items()), file=sys.stderr)
+            last_wall, last_cpu, last_done = wall, cpu, done
+
+    def run(self) -> Dict[str, Any]:
+        self.started = time.perf_counter()
+        threads = [threading.Thread(target=self._student, args=(i,), daemon=True) for i in range(self.students)]
+        threads.append(threading.Thread(target=self._sample, daemon=True))
+        if self.frames_fps > 0 and self.assistant.engagement_detector:
+            threads.append(threading.Thread(target=self._frames, daemon=True))
+        for thread in threads:
+            thread.start()
+        time.sleep(self.duration)
+        self._stop.set()
+        elapsed = time.perf_counter() - self.started
+        # Questions already queued are still answered; they count for latency, not throughput
+        for thread in threads:
+            thread.join()
+        return self.report(elapsed, time.perf_counter() - self.started - elapsed)
+
+    def report(self, elapsed: float, drain: float) -> Dict[str, Any]:
+        ok = [r for r in self.results if r['ok']]
+        in_window = [r for r in ok if r['t'] <= elapsed]
+        # Sustained throughput ignores the ramp-up (the first mean think time)
+        ramp_up = min(self.think, elapsed / 2)
+        steady = [r for r in in_window if r['t'] >= ramp_up]
+        latencies = [r['latency'] for r in ok]
+        report = {
+            'students': self.students,
+            'duration_s': round(elapsed, 1),
+            'drain_s': round(drain, 1),
+            'requests': len(self.results),
+            'answered': len(ok),
+            'rejected': len(self.results) - len(ok),
+            'cached': sum(r['cached'] for r in ok),
+            'throughput_qps': round(len(in_window) / elapsed, 3),
+            'sustained_qps': round(len(steady) / (elapsed - ramp_up), 3),
+            'latency_ms': {name: round(percentile(latencies, fraction) * 1000, 1)
+                           for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))},
+            'max_queue_depth': max((s['queue_depth'] for s in self.samples), default=0),
+            'scheduler': self.assistant.scheduler.stats(),
+            'coalescing': self.assistant.inflight.stats(),
+            'cache': self.assistant.response_cache.stats(),
+            'samples': self.samples
+        }
+        if self.frame_times:
+            report['frames'] = {
+                'analyzed': len(self.frame_times),
+                'fps': round(len(self.frame_times) / elapsed, 1),
+                'ms_p50': round(percentile(self.frame_times, 0.5) * 1000, 2),
+                'ms_p99': round(percentile(self.frame_times, 0.99) * 1000, 2)
+            }
+        return report
+
+
+def load_corpus(path: Optional[str]) -> List[str]:
+    if not path:
+        return DEFAULT_CORPUS
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run")
+    parser.add_argument("--think", type=float, default=10.0, help="Mean think time between questions (seconds)")
+    parser.add_argument("--corpus", help="Text file with one question per line")
+    parser.add_argument("--unique", action="store_true",
+                        help="Make every question unique, defeating the response cache and coalescing")
+    parser.add_argument("--voice-share", type=float, default=0.2, help="Fraction of questions asked by voice")
+    parser.add_argument("--model", choices=("stub", "real"), default="stub")
+    parser.add_argument("--stub-tps", type=float, default=40.0, help="Stub model decode speed, tokens/second")
+    parser.add_argument("--stub-tokens", type=int, default=60, help="Stub model answer length in tokens")
+    parser.add_argument("--frames-fps", type=float, default=0.0,
+                        help="Also analyze synthetic webcam frames at this rate (needs OpenCV)")
+    parser.add_argument("--sample-interval", type=float, default=5.0)
+    parser.add_argument("--data-dir", help="Where the run's interaction store and sessions go (default: a temp dir)")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    models = StubModels(args.stub_tps, args.stub_tokens) if args.model == "stub" else None
+    with tempfile.TemporaryDirectory(prefix="classroom-load-") as temp_dir:
+        assistant = ClassroomAssistant(engagement=args.frames_fps > 0, models=models,
+                                       data_dir=args.data_dir or temp_dir)
+        try:
+            test = LoadTest(assistant, load_corpus(args.corpus), args.students, args.duration, args.think,
+                            args.voice_share, args.unique, args.frames_fps, args.sample_interval)
+            report = test.run()
+        finally:
+            assistant.shutdown()
+
+    latency = report['latency_ms']
+    print(f"\n{report['students']} students, {report['duration_s']} s (+{report['drain_s']} s draining): "
+          f"{report['answered']} answered "
+          f"({report['cached']} from cache), {report['rejected']} rejected")
+    print(f"Throughput {report['throughput_qps']} q/s, sustained {report['sustained_qps']} q/s; "
+          f"latency p50 {latency['p50']} ms, p90 {latency['p90']} ms, p99 {latency['p99']} ms, "
+          f"max {latency['max']} ms; max queue depth {report['max_queue_depth']}")
+    for priority, stats in report['scheduler'].items():
+        if stats['granted'] or stats['expired'] or stats['rate_limited']:
+            print(f"  {priority}: {stats}")
+    if 'frames' in report:
+        print(f"Frames: {report['frames']}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Pre-render the UI's fixed phrases into the phrase audio cache, e.g. as a build step:
+
+    python -m tools.render_phrases --cache-dir data/tts_cache
+
+Rate and volume must match what ClassroomUI passes to SpeechWorker for the cache keys to line up.
+"""
+
+import argparse
+import sys
+
+import pyttsx3
+
+from assistant.phrases import FIXED_PHRASES
+from assistant.speech import PhraseCache
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default="data/tts_cache")
+    parser.add_argument("--rate", type=int, default=150)
+    parser.add_argument("--volume", type=float, default=0.9)
+    parser.add_argument("--force", action="store_true", help="Re-render phrases that are already cached")
+    args = parser.parse_args(argv)
+
+    engine = pyttsx3.init()
+    engine.setProperty('rate', args.rate)
+    engine.setProperty('volume', args.volume)
+    voice = str(engine.getProperty('voice') or "")
+    cache = PhraseCache(args.cache_dir)
+
+    failed = 0
+    for phrase in FIXED_PHRASES:
+        key = PhraseCache.key(phrase, voice, args.rate, args.volume)
+        if not args.force and cache.get(key) is not None:
+            print(f"cached    {phrase}")
+            continue
+        if cache.render(engine, phrase, key) is None:
+            failed += 1
+            print(f"FAILED    {phrase}")
+        else:
+            print(f"rendered  {phrase}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())